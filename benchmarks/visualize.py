@@ -0,0 +1,62 @@
+"""Benchmark ``visualize``: import cost, per-plot render time and plotly exports.
+
+Digests a requirements file into a temporary Excel file, renders every plot
+type once and prints the timings, including the kaleido startup and export
+times collected by the export manager, as JSON.
+
+    python benchmarks/visualize.py data/iot.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from tlparser.config import COLOR_PALETTE, DEFAULT_ORDER, Configuration
+from tlparser.utils import Utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", nargs="?", default=os.path.join("data", "iot.json"))
+    parser.add_argument("--plot", "-p", action="append", help="Plot types to render")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Configuration(
+            file_data_in=args.file,
+            folder_data_out=tmp,
+            only_with_status=["OK"],
+            logic_order=DEFAULT_ORDER,
+            color_palette=COLOR_PALETTE,
+        )
+        util = Utils(config)
+        excel = util.write_to_excel(util.read_formulas_from_json())
+
+        started = time.perf_counter()
+        from tlparser.viz import Viz
+
+        report = {"import_seconds": round(time.perf_counter() - started, 3)}
+        plots = args.plot or list(Viz.plot_methods)
+
+        started = time.perf_counter()
+        viz = Viz(config, excel, plots=plots)
+        report["load_seconds"] = round(time.perf_counter() - started, 3)
+
+        report["plots"] = {}
+        for plot in plots:
+            started = time.perf_counter()
+            viz.render(plot)
+            report["plots"][plot] = round(time.perf_counter() - started, 3)
+        viz.exports.close()  # Writes the batch whose timings are reported below
+        report["exports"] = {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in viz.exports.timings.items()
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
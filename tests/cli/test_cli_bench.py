@@ -0,0 +1,53 @@
+import json
+import os
+
+from click.testing import CliRunner
+
+from tlparser.bench import _formulas, load_dataset, scaled_corpus
+from tlparser.cli import cli
+
+TEST_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+
+def test_bench_reports_json(tmp_path):
+    runner = CliRunner()
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    report_path = tmp_path / "bench.json"
+
+    result = runner.invoke(
+        cli,
+        [
+            "bench",
+            test_json,
+            "-s",
+            "digest",
+            "-s",
+            "parse",
+            "--scale",
+            "3",
+            "--repeat",
+            "2",
+            "--no-isolate",
+            "--output",
+            str(report_path),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    report = json.loads(report_path.read_text())
+    results = {(r["dataset"], r["scenario"]): r for r in report["results"]}
+    assert list(results) == [
+        (dataset, scenario)
+        for dataset in ("test", "testx3")
+        for scenario in ("parse", "digest-xlsx", "digest-json", "digest-frame")
+    ]
+    assert results["testx3", "parse"]["formulas"] == 3 * results["test", "parse"]["formulas"]
+
+    entries = load_dataset(test_json)
+    distinct = {formula for formula, _ in _formulas(entries)}
+    scaled = {formula for formula, _ in _formulas(scaled_corpus(entries, 3))}
+    assert len(scaled) == 3 * len(distinct)
+    for r in report["results"]:
+        assert r["errors"] == 0
+        assert r["formulas_per_sec"] > 0
+        assert r["p50_ms"] <= r["p95_ms"]
@@ -1,7 +1,14 @@
+import glob
+import json
 import os
 import shutil
+import signal
+import subprocess
+import sys
+import time
 
 import pandas as pd
+import pytest
 from click.testing import CliRunner
 
 from tlparser.cli import cli
@@ -34,6 +41,212 @@ def test_digest_command():
     assert not df.empty, "The output file is empty."
 
 
+def test_digest_merges_multiple_files():
+    runner = CliRunner()
+
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    merge_dir = os.path.join(WORKING_DIR, "merge")
+
+    with runner.isolated_filesystem():
+        shutil.copy(test_json, "a.json")
+        shutil.copy(test_json, "b.json")
+        result = runner.invoke(
+            cli, ["digest", "*.json", "--merge", "--jobs", "2", "--output", merge_dir]
+        )
+        assert result.exit_code == 0, result.output
+
+    outputs = os.listdir(merge_dir)
+    assert len(outputs) == 1 and outputs[0].startswith("merged_")
+
+    df = pd.read_excel(os.path.join(merge_dir, outputs[0]))
+    assert df.columns[0] == "source"
+    assert df["source"].tolist() == ["a.json"] * 10 + ["b.json"] * 10
+    assert (
+        df[df["source"] == "a.json"]["translationclass"].tolist()
+        == df[df["source"] == "b.json"]["translationclass"].tolist()
+    )
+
+
+def test_digest_shards_merge_like_single_run():
+    runner = CliRunner()
+
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    single_dir = os.path.join(WORKING_DIR, "single")
+    shard_dir = os.path.join(WORKING_DIR, "shards")
+    merged_dir = os.path.join(WORKING_DIR, "merged")
+
+    result = runner.invoke(cli, ["digest", test_json, "--output", single_dir])
+    assert result.exit_code == 0, result.output
+    for index in (1, 2, 3):
+        result = runner.invoke(
+            cli, ["digest", test_json, "--shard", f"{index}/3", "-o", shard_dir]
+        )
+        assert result.exit_code == 0, result.output
+    shard_files = sorted(os.listdir(shard_dir))
+    assert [f.split("_")[1] for f in shard_files] == ["shard1of3", "shard2of3", "shard3of3"]
+
+    result = runner.invoke(
+        cli,
+        ["merge", *[os.path.join(shard_dir, f) for f in shard_files], "-o", merged_dir],
+    )
+    assert result.exit_code == 0, result.output
+
+    single = pd.read_excel(os.path.join(single_dir, os.listdir(single_dir)[0]))
+    merged = pd.read_excel(os.path.join(merged_dir, os.listdir(merged_dir)[0]))
+    pd.testing.assert_frame_equal(single, merged, check_dtype=False)
+
+
+def test_digest_rejects_invalid_shard():
+    runner = CliRunner()
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    result = runner.invoke(cli, ["digest", test_json, "--shard", "4/3"])
+    assert result.exit_code != 0
+    assert "I/N" in result.output
+
+
+def test_digest_continues_past_unparsable_formulas():
+    runner = CliRunner()
+
+    failed_dir = os.path.join(WORKING_DIR, "failed")
+    with open(os.path.join(TEST_DATA_DIR, "test.json")) as fh:
+        data = json.load(fh)
+    data[1]["logics"][0]["f_code"] = "G(p -->)"
+    data[3]["logics"][0]["f_code"] = "F[0,5] p"
+
+    with runner.isolated_filesystem():
+        with open("broken.json", "w") as fh:
+            json.dump(data, fh)
+        result = runner.invoke(cli, ["digest", "broken.json", "-o", failed_dir])
+    assert result.exit_code == 2, result.output
+
+    outputs = sorted(os.listdir(failed_dir))
+    assert len(outputs) == 2 and outputs[1].endswith("_failed.md")
+    df = pd.read_excel(os.path.join(failed_dir, outputs[0]))
+    assert len(df) == 10
+    errors = df["error"].dropna()
+    assert len(errors) == 2
+    assert errors.str.startswith("UnexpectedToken").any()
+    assert df.loc[df["error"].isna(), "stats.asth"].notna().all()
+
+
+def test_digest_same_named_files_in_different_folders():
+    runner = CliRunner()
+
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    same_dir = os.path.join(WORKING_DIR, "same")
+
+    with runner.isolated_filesystem():
+        for folder in ("a", "b"):
+            os.makedirs(folder)
+            shutil.copy(test_json, os.path.join(folder, "req.json"))
+        result = runner.invoke(cli, ["digest", "*/req.json", "-o", same_dir])
+        assert result.exit_code == 0, result.output
+
+    outputs = sorted(os.listdir(same_dir))
+    assert len(outputs) == 2 and outputs[0] != outputs[1]
+    assert all(name.startswith("req_") and name.endswith(".xlsx") for name in outputs)
+
+
+def test_digest_plots_without_excel_round_trip():
+    runner = CliRunner()
+
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    plot_dir = os.path.join(WORKING_DIR, "plots")
+    shutil.rmtree(plot_dir, ignore_errors=True)
+
+    result = runner.invoke(
+        cli,
+        ["digest", test_json, "--plot", "sankey", "--plots-only", "--output", plot_dir],
+    )
+    assert result.exit_code == 0, result.output
+    assert "Generated sankey plot." in result.output
+
+    outputs = os.listdir(plot_dir)
+    assert not any(name.endswith(".xlsx") for name in outputs)
+    assert any(name.startswith("sankey_") and name.endswith(".pdf") for name in outputs)
+
+
+def test_digest_profile_reports_stages():
+    runner = CliRunner()
+
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    profile_dir = os.path.join(WORKING_DIR, "profile")
+    shutil.rmtree(profile_dir, ignore_errors=True)
+
+    result = runner.invoke(
+        cli, ["digest", test_json, "--profile", "--output", profile_dir]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Stage timings of 'digest'" in result.output
+
+    (profile_file,) = [f for f in os.listdir(profile_dir) if f.endswith("_profile.json")]
+    with open(os.path.join(profile_dir, profile_file)) as fh:
+        stages = json.load(fh)["stages"]
+    assert stages["stats.parse"]["count"] > 0
+    assert stages["utils.excel_write"]["count"] == 1
+    assert stages["digest"]["total_s"] >= stages["utils.excel_write"]["total_s"]
+
+
+# Runs the CLI with every row slowed down, so a digest can be interrupted
+SLOW_DIGEST = """
+import sys, time
+from tlparser.cli import cli
+from tlparser.utils import Utils
+
+analyze_logic = Utils.analyze_logic
+
+
+def slow_analyze_logic(*args, **kwargs):
+    time.sleep(0.5)
+    return analyze_logic(*args, **kwargs)
+
+
+Utils.analyze_logic = staticmethod(slow_analyze_logic)
+cli(sys.argv[1:])
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGINT")
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_digest_stops_promptly_on_ctrl_c(tmp_path, jobs):
+    test_json = os.path.join(TEST_DATA_DIR, "test.json")
+    inputs = []
+    for name in ("a.json", "b.json"):
+        shutil.copy(test_json, tmp_path / name)
+        inputs.append(str(tmp_path / name))
+    out_dir = tmp_path / "out"
+
+    proc = subprocess.Popen(
+        [sys.executable, "-c", SLOW_DIGEST, "digest", *inputs, "-o", str(out_dir)]
+        + ["--jobs", str(jobs)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            journals = glob.glob(str(out_dir / "*_journal.jsonl"))
+            if any(sum(1 for _ in open(j)) > 1 for j in journals):
+                break  # The settings header and a first row are checkpointed
+            time.sleep(0.05)
+        interrupted = time.monotonic()
+        proc.send_signal(signal.SIGINT)
+        proc.wait(timeout=30)
+        # 20 rows of 0.5 s remain; stopping takes at most the rows in progress
+        assert time.monotonic() - interrupted < 3
+    finally:
+        proc.kill()
+        proc.wait()
+
+    assert proc.returncode != 0
+    rows = sum(
+        sum(1 for _ in open(journal)) - 1
+        for journal in glob.glob(str(out_dir / "*_journal.jsonl"))
+    )
+    assert 1 <= rows < 20
+    assert not glob.glob(str(out_dir / "*.xlsx"))
+
+
 def teardown_module():
     if os.path.isdir(WORKING_DIR):
         shutil.rmtree(WORKING_DIR)
@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from tlparser.cli import cli
+
+
+def test_evaluate_batch_from_stdin():
+    runner = CliRunner()
+    lines = [
+        "G p",
+        "",
+        json.dumps({"formula": "G (x <= 7 --> F y)", "text": "x stays small"}),
+        "G (",
+    ]
+    result = runner.invoke(cli, ["evaluate", "--stdin"], input="\n".join(lines))
+    assert result.exit_code == 1
+
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(records) == 3
+    assert records[0]["formula_raw"] == "G p"
+    assert records[1]["req_word_count"] == 3
+    assert records[1]["agg"]["cops"] == 1
+    assert records[2]["line"] == 4 and "error" in records[2]
+
+
+def test_evaluate_batch_streams_results():
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "tlparser", "evaluate", "--batch", "-"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        for formula in ["G p", "F (a & b)"]:
+            proc.stdin.write(formula + "\n")
+            proc.stdin.flush()
+            # The result arrives while the input stream is still open
+            assert json.loads(proc.stdout.readline())["formula_raw"] == formula
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=30)
+    assert proc.returncode == 0
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+TEST_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data"))
+
+# Import-time budgets in seconds (the plotting stack alone takes several seconds).
+# Wall-clock budgets are too noisy for shared CI runners, so they are only
+# checked with TLPARSER_IMPORT_BUDGETS=1.
+BUDGETS = {"evaluate": 0.75, "digest": 1.5}
+CHECK_BUDGETS = os.environ.get("TLPARSER_IMPORT_BUDGETS") == "1"
+HEAVY_MODULES = {
+    "matplotlib",
+    "seaborn",
+    "plotly",
+    "networkx",
+    "pyvis",
+    "d3blocks",
+    "scipy",
+}
+
+
+def run_with_importtime(*args):
+    """Run the CLI under ``python -X importtime``; return (modules, total seconds)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "tlparser", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip().split(".")[0])
+        if not name[1:].startswith(" "):  # Top-level imports only
+            total += int(cumulative)
+    return modules, total / 1e6
+
+
+def test_version_skips_analysis_and_plotting_imports():
+    modules, _ = run_with_importtime("--version")
+    assert not modules & HEAVY_MODULES
+
+
+def test_evaluate_skips_heavy_imports():
+    modules, _ = run_with_importtime("evaluate", "G p")
+    assert not modules & (HEAVY_MODULES | {"pandas", "numpy", "openpyxl"})
+
+
+def test_digest_skips_plotting_imports():
+    with tempfile.TemporaryDirectory() as tmp:
+        modules, _ = run_with_importtime(
+            "digest", os.path.join(TEST_DATA_DIR, "test.json"), "--output", tmp
+        )
+    assert not modules & HEAVY_MODULES
+
+
+@pytest.mark.skipif(not CHECK_BUDGETS, reason="set TLPARSER_IMPORT_BUDGETS=1")
+def test_import_budgets():
+    _, seconds = run_with_importtime("evaluate", "G p")
+    assert seconds < BUDGETS["evaluate"], f"evaluate imports took {seconds:.2f}s"
+    with tempfile.TemporaryDirectory() as tmp:
+        _, seconds = run_with_importtime(
+            "digest", os.path.join(TEST_DATA_DIR, "test.json"), "--output", tmp
+        )
+    assert seconds < BUDGETS["digest"], f"digest imports took {seconds:.2f}s"
+
+
+def test_cli_skips_bench_and_generate_imports():
+    modules = {"tlparser.bench", "tlparser.generate", "multiprocessing"}
+    code = f"import sys, tlparser.cli; print(sorted({modules!r} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+import tlparser
+from tlparser.config import Configuration
+from tlparser.utils import Utils
+
+TEST_JSON = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "test.json")
+)
+
+
+class TestApi(TestCase):
+    def test_analyze(self):
+        result = tlparser.analyze("G (x <= 7 --> F y)", "x stays small")
+        self.assertEqual(["x_leq_n7", "y"], result["ap"])
+        self.assertEqual(3, result["req_word_count"])
+
+    def test_analyze_many_keeps_order_and_isolates_errors(self):
+        formulas = [f"G (p{i} --> F q{i})" for i in range(20)]
+        formulas.insert(5, ("G (", "unparsable"))
+        results = list(tlparser.analyze_many(iter(formulas), jobs=4))
+
+        self.assertEqual(21, len(results))
+        self.assertIn("error", results[5])
+        self.assertEqual(
+            [f for f in formulas if isinstance(f, str)],
+            [r["formula_raw"] for r in results if "error" not in r],
+        )
+
+    def test_iter_digest_matches_utils(self):
+        with open(TEST_JSON, "r", encoding="utf-8") as fh:
+            entries = json.load(fh)
+        expected = Utils(
+            Configuration(
+                file_data_in=TEST_JSON,
+                only_with_status=["OK"],
+                logic_order=["INV", "LTL", "MTLb", "MITL", "TPTL", "CTLS", "STL"],
+            )
+        ).read_formulas_from_json()
+
+        self.assertEqual(
+            [Utils.serialize_item(item) for item in expected],
+            list(tlparser.iter_digest(TEST_JSON)),
+        )
+        self.assertEqual(
+            [Utils.serialize_item(item) for item in expected],
+            list(tlparser.iter_digest(entries, jobs=3)),
+        )
+
+    def test_api_does_not_import_the_cli(self):
+        code = "import sys, tlparser.api; print('tlparser.cli' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual("False", result.stdout.strip())
@@ -0,0 +1,57 @@
+import json
+import os
+import re
+from unittest import TestCase
+
+from tlparser.generate import LOGICS, CorpusGenerator
+from tlparser.stats import Stats
+
+TEST_JSON = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "test.json")
+)
+
+
+class TestCorpusGenerator(TestCase):
+    def test_corpus_is_seeded(self):
+        self.assertEqual(
+            CorpusGenerator(seed=7).corpus(20), CorpusGenerator(seed=7).corpus(20)
+        )
+        self.assertNotEqual(
+            CorpusGenerator(seed=7).corpus(20), CorpusGenerator(seed=8).corpus(20)
+        )
+
+    def test_formulas_parse_with_the_drawn_depth(self):
+        generator = CorpusGenerator(seed=1, vocabulary=5, width=4)
+        for logic in LOGICS:
+            for depth in range(1, 7):
+                with self.subTest(logic=logic, depth=depth):
+                    formula = generator.formula(logic, depth)
+                    self.assertEqual(depth, Stats(formula).asth)
+                    names = set(re.findall(r"p\d+", formula))
+                    self.assertLessEqual(names, set(generator.names))
+
+    def test_labels_and_operator_mix(self):
+        generator = CorpusGenerator(
+            seed=2,
+            logics=["MITL", "STL"],
+            natural_weights={"STL": 1},
+            translation_weights={"yes": 1},
+            operator_mix={"STL": {"F": 0, "G": 0, "U": 0}},
+        )
+        for entry in generator.corpus(30):
+            self.assertEqual(["MITL", "STL"], [l["type"] for l in entry["logics"]])
+            self.assertEqual(["yes", "self"], [l["translation"] for l in entry["logics"]])
+            mitl, stl = (Stats(l["f_code"]) for l in entry["logics"])
+            self.assertEqual(0, mitl.tops["X"])
+            self.assertEqual(0, stl.agg["tops"])
+
+    def test_mutated_formulas_keep_their_shape(self):
+        with open(TEST_JSON, "r", encoding="utf-8") as fh:
+            templates = json.load(fh)
+        for entry in CorpusGenerator(seed=3).mutated_corpus(templates, 50):
+            template = next(t for t in templates if t["text"] == entry["text"])
+            for logic, original in zip(entry["logics"], template["logics"]):
+                if original["f_code"]:
+                    self.assertEqual(
+                        Stats(original["f_code"]).asth, Stats(logic["f_code"]).asth
+                    )
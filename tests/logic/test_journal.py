@@ -0,0 +1,100 @@
+import os
+import tempfile
+from contextlib import nullcontext
+from unittest import TestCase
+
+from tlparser.config import Configuration
+from tlparser.journal import Journal
+from tlparser.utils import Utils
+
+TEST_JSON = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "test.json")
+)
+
+
+class _Interrupt(Exception):
+    pass
+
+
+class _InterruptingProgress:
+    def __init__(self, after):
+        self.after = after
+
+    def update(self, n):
+        self.after -= n
+        if self.after == 0:
+            raise _Interrupt()
+
+
+class _CountingUtils(Utils):
+    analyzed = 0
+
+    def analyze_logic(self, *args, **kwargs):
+        type(self).analyzed += 1
+        return Utils.analyze_logic(*args, **kwargs)
+
+
+class TestJournal(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Journal.path_for(self.tmp.name, "test")
+        self.util = _CountingUtils(
+            Configuration(
+                file_data_in=TEST_JSON,
+                folder_data_out=self.tmp.name,
+                only_with_status=["OK"],
+                logic_order=["INV", "LTL", "MTLb", "MITL", "TPTL", "CTLS", "STL"],
+            )
+        )
+        _CountingUtils.analyzed = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _interrupted_run(self, after):
+        with Journal(self.path).open() as journal:
+            with self.assertRaises(_Interrupt):
+                self.util.read_formulas_from_json(
+                    journal=journal,
+                    progress_factory=lambda _: nullcontext(
+                        _InterruptingProgress(after)
+                    ),
+                )
+
+    def test_interrupted_rows_are_checkpointed(self):
+        self._interrupted_run(after=4)
+        journal = Journal(self.path)
+        self.assertEqual(4, journal.load())
+        self.assertIn((1, "INV"), journal.completed)
+
+    def test_existing_journal_requires_resume(self):
+        self._interrupted_run(after=4)
+        with self.assertRaises(FileExistsError):
+            Journal(self.path).open()
+
+    def test_resume_rejects_other_settings(self):
+        with Journal(self.path, settings={"extended": False}).open():
+            pass
+        with self.assertRaises(ValueError):
+            Journal(self.path, settings={"extended": True}).open(resume=True)
+        journal = Journal(self.path, settings={"extended": False}).open(resume=True)
+        journal.close()
+
+    def test_resume_skips_completed_rows(self):
+        self._interrupted_run(after=4)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write('{"item": {"id"')  # torn write of a crashed run
+
+        with Journal(self.path).open(resume=True) as journal:
+            resumed = self.util.read_formulas_from_json(journal=journal)
+        fresh = Utils(self.util.config).read_formulas_from_json()
+
+        self.assertEqual(10, _CountingUtils.analyzed)  # 4 + 6, nothing twice
+        self.assertEqual(
+            [(i["id"], i["type"]) for i in fresh],
+            [(i["id"], i["type"]) for i in resumed],
+        )
+        self.assertEqual(
+            [str(i["stats"]["formula_parsed"]) for i in fresh],
+            [str(i["stats"]["formula_parsed"]) for i in resumed],
+        )
@@ -0,0 +1,48 @@
+import warnings
+from unittest import TestCase
+
+from tlparser.postprocess import add_translation_class, iter_translation_class
+
+LOGIC_ORDER = ["INV", "LTL", "MTLb", "MITL", "TPTL", "CTLS", "STL"]
+
+ROWS = (
+    {"id": 2, "type": "TPTL", "translation": "yes"},
+    {"id": 2, "type": "LTL", "translation": "self"},
+    {"id": 1, "type": "CTLS", "translation": "no"},
+    {"id": 1, "type": "INV", "translation": "self"},
+    {"id": 1, "type": "MITL", "translation": "depends"},
+    {"id": "x", "type": "UNKNOWN", "translation": "unknown"},
+    {"id": "x", "type": "STL", "translation": "self"},
+)
+
+
+class TestTranslationClass(TestCase):
+    def _rows(self):
+        return [dict(row) for row in ROWS]
+
+    def test_classes_follow_logic_order(self):
+        rows = add_translation_class(self._rows(), LOGIC_ORDER)
+        self.assertEqual(
+            ["sy", "sy", "sdn", "sdn", "sdn", "su", "su"],
+            [row["translationclass"] for row in rows],
+        )
+
+    def test_unknown_types_sort_last_without_warnings(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            rows = add_translation_class(self._rows()[-2:], LOGIC_ORDER)
+        self.assertEqual(["su", "su"], [row["translationclass"] for row in rows])
+
+    def test_streaming_matches_batch(self):
+        expected = add_translation_class(self._rows(), LOGIC_ORDER)
+        for batch_size in (1, 2, 3, 100):
+            with self.subTest(batch_size=batch_size):
+                streamed = list(
+                    iter_translation_class(
+                        self._rows(), LOGIC_ORDER, batch_size=batch_size
+                    )
+                )
+                self.assertEqual(expected, streamed)
+
+    def test_empty_input(self):
+        self.assertEqual([], add_translation_class([], LOGIC_ORDER))
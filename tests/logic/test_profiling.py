@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+from tlparser import profiling
+from tlparser.stats import Stats
+
+
+class TestProfiling(TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_stages_are_no_ops_unless_enabled(self):
+        self.assertIsNone(profiling.active())
+        self.assertIs(profiling.stage("a"), profiling.stage("b"))
+        Stats("G (x <= 7 --> F y)")
+        self.assertIsNone(profiling.disable())
+
+    def test_stats_stages_are_timed(self):
+        profiling.enable()
+        for formula in ("G p", "F (q and r)", "p U q"):
+            Stats(formula)
+        summary = profiling.disable().summary()
+
+        for name in ("stats.rewrite", "stats.parse", "stats.ast_walk", "stats.entropy"):
+            self.assertEqual(3, summary[name]["count"], name)
+            stage = summary[name]
+            self.assertLessEqual(stage["p50_ms"], stage["p95_ms"])
+            self.assertLessEqual(stage["p95_ms"], stage["max_ms"])
+        self.assertIsNone(profiling.active())
+
+    def test_percentile(self):
+        self.assertEqual(2.5, profiling.percentile([4, 1, 3, 2], 50))
+        self.assertAlmostEqual(3.85, profiling.percentile([1, 2, 3, 4], 95))
+        self.assertIsNone(profiling.percentile([], 50))
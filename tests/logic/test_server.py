@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from unittest import TestCase
+
+from tlparser.server import AnalysisServer, AnalysisService
+
+TEST_JSON = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "test.json")
+)
+
+
+class TestAnalysisServer(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        service = AnalysisService(
+            logic_order=["INV", "LTL", "MTLb", "MITL", "TPTL", "CTLS", "STL"]
+        )
+        service.warm_up()
+        cls.server = AnalysisServer(("127.0.0.1", 0), service, workers=4)
+        cls.url = "http://127.0.0.1:{}".format(cls.server.server_address[1])
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def request(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        try:
+            with urllib.request.urlopen(self.url + path, data=data) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            return exc.code, json.loads(exc.read())
+
+    def test_health(self):
+        status, body = self.request("/health")
+        self.assertEqual(200, status)
+        self.assertEqual("ok", body["status"])
+
+    def test_evaluate_is_cached(self):
+        payload = {"formula": "G (x <= 7 --> F y)", "text": "x stays small"}
+        status, first = self.request("/evaluate", payload)
+        self.assertEqual(200, status)
+        self.assertEqual(["x_leq_n7", "y"], first["result"]["ap"])
+
+        hits = self.request("/metrics")[1]["cache_hits"]
+        self.assertEqual(first, self.request("/evaluate", payload)[1])
+        self.assertEqual(hits + 1, self.request("/metrics")[1]["cache_hits"])
+
+    def test_evaluate_rejects_invalid_formulas(self):
+        self.assertEqual(422, self.request("/evaluate", {"formula": "G ("})[0])
+        self.assertEqual(400, self.request("/evaluate", {"text": "no formula"})[0])
+        payload = {"formula": "G p", "extended": "false"}
+        self.assertEqual(400, self.request("/evaluate", payload)[0])
+        self.assertEqual(404, self.request("/unknown")[0])
+
+    def test_digest_entries(self):
+        with open(TEST_JSON, "r", encoding="utf-8") as fh:
+            entries = json.load(fh)
+        status, body = self.request("/digest", {"entries": entries})
+        self.assertEqual(200, status)
+        self.assertEqual(10, len(body["results"]))
+        self.assertEqual(0, body["failed"])
+
+    def test_concurrent_requests(self):
+        formulas = [f"G (p{i} --> F q{i})" for i in range(16)]
+        results = [None] * len(formulas)
+
+        def evaluate(i):
+            results[i] = self.request("/evaluate", {"formula": formulas[i]})
+
+        threads = [threading.Thread(target=evaluate, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for formula, (status, body) in zip(formulas, results):
+            self.assertEqual(200, status)
+            self.assertEqual(formula, body["result"]["formula_raw"])
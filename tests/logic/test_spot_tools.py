@@ -0,0 +1,74 @@
+import subprocess
+from unittest import TestCase
+from unittest.mock import patch
+
+from tlparser import spot_tools
+
+# Canned ltl2tgba --stats answers: (default, -B, -D)
+STATS = {
+    "G p": ("1 1 0 1 0", "1 1 0 1 1", "1 2 1 1 0"),
+    "F G s": ("2 4 1 0 1", "2 4 1 0 1", None),
+}
+
+
+class FakeSpot:
+    """Stands in for the Spot CLI tools and records every invocation."""
+
+    def __init__(self, stutter_invariant=True):
+        self.stutter_invariant = stutter_invariant
+        self.calls = []
+
+    def __call__(self, command, input_data=None):
+        self.calls.append(command)
+        tool, formula = command[0], command[2] if len(command) > 2 else None
+        if tool == "ltlfilt":
+            if "--stutter-invariant" in command and not self.stutter_invariant:
+                raise subprocess.CalledProcessError(2, command, stderr="boom")
+            if command[-1].startswith("--format="):
+                return "safety"
+            return formula
+        if tool == "autfilt":
+            return "HOA: v1" if "--is-stutter-invariant" in command else ""
+        if not command[-1].startswith("--stats="):
+            return "HOA: v1"
+        default, buchi, deterministic = STATS[formula]
+        answer = deterministic if "-D" in command else buchi if "-B" in command else default
+        if answer is None:
+            raise subprocess.CalledProcessError(2, command, stderr="no deterministic")
+        return answer
+
+
+class TestClassifyLtlProperty(TestCase):
+    def classify(self, formula, **kwargs):
+        fake = FakeSpot(**kwargs)
+        with patch.object(spot_tools, "invoke", fake), patch.object(
+            spot_tools, "_which_all", lambda names: {name: name for name in names}
+        ):
+            return spot_tools.classify_ltl_property(formula), fake.calls
+
+    def test_deterministic_attempt_runs_its_own_translation(self):
+        result, calls = self.classify("G p")
+        # 3 ltlfilt checks, TGBA, Buchi and -D stats; no HOA or autfilt runs
+        self.assertEqual(6, len(calls))
+        self.assertFalse(any(call[0] == "autfilt" for call in calls))
+        self.assertIn("-D", calls[-1])
+        self.assertTrue(result["deterministic_attempt"]["success"])
+        self.assertEqual(
+            2, result["deterministic_attempt"]["automaton_analysis"]["transition_count"]
+        )
+        self.assertEqual(1, result["buchi_analysis"]["acceptance_sets"])
+        for analysis in (result["tgba_analysis"], result["buchi_analysis"]):
+            self.assertIs(True, analysis["is_stutter_invariant"])
+
+    def test_failed_deterministic_translation(self):
+        result, calls = self.classify("F G s")
+        self.assertEqual(6, len(calls))
+        self.assertFalse(result["deterministic_attempt"]["success"])
+        self.assertIn("error", result["deterministic_attempt"])
+
+    def test_automaton_stutter_check_runs_once(self):
+        result, calls = self.classify("G p", stutter_invariant=False)
+        self.assertEqual("Error", result["is_stutter_invariant_formula"])
+        autfilt_calls = [call for call in calls if call[0] == "autfilt"]
+        self.assertEqual([["autfilt", "--is-stutter-invariant"]], autfilt_calls)
+        self.assertIs(True, result["buchi_analysis"]["is_stutter_invariant"])
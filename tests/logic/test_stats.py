@@ -1,6 +1,8 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 
-from tlparser.stats import Stats
+from tlparser.stats import Stats, StatsCache
 from test_case_data import TestCaseData
 
 
@@ -192,3 +194,50 @@ class TestInit(TestStats):
                     round(f.entropy["lops_tops"], 3),
                     case.f_code,
                 )
+
+
+class TestStatsCache(TestCase):
+    def test_rows_share_formula_analysis(self):
+        cache = StatsCache()
+        first = cache.get_stats("G(x <= 7 --> F y)", "Short.")
+        second = cache.get_stats("G(x <= 7 --> F y)", "A longer requirement text.")
+
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        expected = Stats("G(x <= 7 --> F y)", "A longer requirement text.")
+        self.assertEqual(expected.get_stats(), second)
+        self.assertEqual(first["ap"], second["ap"])
+        self.assertIsNot(first["ap"], second["ap"])
+
+    def test_concurrent_misses_analyze_once(self):
+        cache = StatsCache()
+        formula = " and ".join(f"G (p{i} --> F q{i})" for i in range(40))
+        barrier = threading.Barrier(8)
+
+        def lookup(_):
+            barrier.wait()
+            return cache.get_stats(formula)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lookup, range(8)))
+
+        self.assertEqual((7, 1), (cache.hits, cache.misses))
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_extended_results_are_cached_separately(self):
+        cache = StatsCache()
+        cache.get_stats("G p", "Text.")
+        extended = cache.get_stats("G p", "Text.", extended=True)
+
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+        self.assertEqual(Stats("G p", "Text.", extended=True).get_stats(), extended)
+
+    def test_failures_are_cached(self):
+        cache = StatsCache()
+        raised = []
+        for _ in range(2):
+            with self.assertRaises(Exception) as ctx:
+                cache.get_stats("G (")
+            raised.append(ctx.exception)
+        self.assertEqual(0.5, cache.hit_ratio)
+        self.assertIsNot(raised[0], raised[1])
+        self.assertEqual(str(raised[0]), str(raised[1]))
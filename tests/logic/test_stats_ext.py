@@ -1,7 +1,7 @@
 from unittest import TestCase
 
 from tlparser.stats import Stats
-from tlparser.stats_ext import SpotAnalyzer
+from tlparser.stats_ext import SpotAnalyzer, canonical_shape, to_spot_syntax
 from test_case_data import TestCaseDataExt
 
 
@@ -507,3 +507,77 @@ class TestStatsExtended(TestCase):
         for case in self.data:
             with self.subTest(formula=case.f_code):
                 self.assertEqual(case.aps, stats_by_case[case.f_code].agg["aps"], case.f_code)
+
+
+class TestCanonicalShape(TestCase):
+    def test_relabels_propositions_in_order(self):
+        self.assertEqual("G (p0 -> F p1)", canonical_shape("G (req -> F ack)"))
+        self.assertEqual("G (p0 -> F p1)", canonical_shape("G (b -> F a)"))
+        self.assertEqual("p0 U (p0 & !p1)", canonical_shape("x U (x & !y1)"))
+        self.assertEqual(
+            "G (p0 -> F p1)", canonical_shape('G ("GPSrecv" -> F "Goal")')
+        )
+
+    def test_ambiguous_tokens_are_not_relabelled(self):
+        self.assertIsNone(canonical_shape("GFa -> GFb"))
+        self.assertIsNone(canonical_shape("G (x <= 7)"))
+
+    def test_same_shape_shares_one_pipeline(self):
+        analyzer = SpotAnalyzer()
+        analyzer._available = True
+        analyzer._classify = lambda formula, verbose=False: {
+            "formula": formula,
+            "deterministic_attempt": {"error": f"ltl2tgba -f '{formula}' failed"},
+        }
+
+        first = analyzer.classify("G (req --> F ack)")
+        second = analyzer.classify("G (a --> F b)")
+
+        self.assertEqual(1, analyzer.pipeline_runs)
+        self.assertEqual("G (a -> F b)", second["spot_formula"])
+        self.assertEqual(
+            "ltl2tgba -f 'G (req -> F ack)' failed",
+            first["deterministic_attempt"]["error"],
+        )
+
+
+class TestSpotFragment(TestCase):
+    def setUp(self):
+        self.analyzer = SpotAnalyzer()
+        self.analyzer._available = True
+        self.analyzer._classify = lambda formula, verbose=False: {"formula": formula}
+
+    def test_out_of_fragment_formulas_skip_spot(self):
+        for formula in ("A G p", "E F (p & q)"):
+            with self.subTest(formula=formula):
+                stats = Stats(formula, extended=True, spot_analyzer=self.analyzer)
+                self.assertTrue(stats.spot["skip_reason"].startswith("not applicable"))
+        self.assertEqual(0, self.analyzer.pipeline_runs)
+        self.assertEqual({"path quantifiers (CTL*)": 2}, self.analyzer.skipped)
+
+    def test_ltl_formulas_reach_spot(self):
+        for formula in ("G (req --> F ack)", "G (x <= 7 --> F y)"):
+            stats = Stats(formula, extended=True, spot_analyzer=self.analyzer)
+            self.assertNotIn("skip_reason", stats.spot)
+        self.assertEqual(1, self.analyzer.pipeline_runs)  # Same shape
+
+
+class TestToSpotSyntax(TestCase):
+    def test_emits_spot_ltl(self):
+        cases = {
+            "F G s": "F G s",
+            "G (req --> F ack)": "G (req -> F ack)",
+            "G (not(crit1 & crit2))": "G !(crit1 & crit2)",
+            "G((x <= 7) --> (not (y)))": "G (x_leq_7 -> !y)",
+            "true U (a or b or c)": "true U (a | b | c)",
+            "(a U b) R not_ready": "(a U b) R not_ready",
+            "G (GPSrecv --> F Goal)": 'G ("GPSrecv" -> F "Goal")',
+            "F X_dn1dd": 'F "X_dn1dd"',
+        }
+        for formula, expected in cases.items():
+            with self.subTest(formula=formula):
+                self.assertEqual(expected, to_spot_syntax(Stats(formula).formula_parsed))
+
+    def test_path_quantifiers_are_rejected(self):
+        with self.assertRaises(ValueError):
+            to_spot_syntax(Stats("A G p").formula_parsed)
@@ -0,0 +1,137 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+
+from tlparser.config import COLOR_PALETTE, DEFAULT_ORDER, Configuration
+from tlparser.export import ExportManager
+from tlparser.plot_cache import PlotCache
+from tlparser.utils import Utils
+from tlparser.viz import Viz, _smoothed_density, render_plots
+
+TEST_JSON = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "test.json")
+)
+
+
+class TestViz(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.config = Configuration(
+            file_data_in=TEST_JSON,
+            folder_data_out=cls.tmp.name,
+            only_with_status=["OK"],
+            logic_order=DEFAULT_ORDER,
+            color_palette=COLOR_PALETTE,
+        )
+        util = Utils(cls.config)
+        cls.excel = util.write_to_excel(util.read_formulas_from_json())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_parallel_rendering_shares_one_stamp(self):
+        viz = Viz(self.config, self.excel, stamp="run1")
+        outputs = {
+            plot: out
+            for plot, out, _ in render_plots(viz, ["hist", "viol_req", "sankey"], jobs=2)
+        }
+
+        self.assertEqual(["hist", "viol_req", "sankey"], list(outputs))
+        for plot, out in outputs.items():
+            self.assertTrue(os.path.isfile(out), plot)
+            self.assertTrue(out.endswith("_run1.pdf"), out)
+
+    def test_dataset_is_pruned_and_typed(self):
+        data = Viz(self.config, self.excel, plots=["sankey"]).data
+        self.assertEqual({"id", "type", "translation"}, set(data.columns))
+        self.assertEqual(["INV", "LTL", "TPTL", "CTLS"], list(data["type"].cat.categories))
+        self.assertTrue(data["type"].cat.ordered)
+
+        data = Viz(self.config, self.excel, plots=["hist", "viol"]).data
+        self.assertLess(data["stats.agg.aps"].dtype.itemsize, 8)
+
+    def test_plotly_exports_are_deferred_to_the_export_manager(self):
+        viz = Viz(self.config, self.excel, stamp="export")
+        self.assertEqual(0, viz.exports.timings["exports"])
+        out = viz.render("sankey")
+        self.assertFalse(os.path.exists(out))
+        viz.exports.close()
+        self.assertTrue(os.path.isfile(out))
+        self.assertEqual(1, viz.exports.timings["exports"])
+
+    def test_plotly_exports_of_a_run_are_written_in_one_batch(self):
+        viz = Viz(self.config, self.excel, stamp="batch")
+        flushes = []
+        flush = viz.exports.flush
+
+        def counting_flush():
+            flushes.append(len(viz.exports._pending))
+            flush()
+
+        viz.exports.flush = counting_flush
+        outputs = [out for _, out, _ in render_plots(viz, ["sankey", "hist"])]
+        self.assertEqual([1], flushes)
+        self.assertTrue(all(os.path.isfile(out) for out in outputs))
+
+    def test_closing_the_exports_stops_the_kaleido_server(self):
+        stopped = []
+        kaleido = SimpleNamespace(stop_sync_server=lambda **_: stopped.append(True))
+        exports = ExportManager()
+        exports._started = exports._batch_api = True
+        with patch.dict("sys.modules", kaleido=kaleido):
+            exports.close()
+            exports.close()
+        self.assertEqual([True], stopped)
+
+    def test_translation_flows(self):
+        flows = Viz(self.config, self.excel).translation_flows
+        self.assertEqual(
+            [("yes", "INV", "TPTL", 1), ("yes", "LTL", "TPTL", 3), ("no", "CTLS", "LTL", 1)],
+            [tuple(row) for row in flows[["translation", "source", "target", "ids"]].values],
+        )
+
+    def test_dataset_from_in_memory_results(self):
+        util = Utils(self.config)
+        frame = util.to_dataframe(util.read_formulas_from_json())
+        from_frame = Viz(self.config, frame, plots=["hist", "sankey"])
+        from_excel = Viz(self.config, self.excel, plots=["hist", "sankey"])
+
+        self.assertEqual(list(from_excel.data.columns), list(from_frame.data.columns))
+        self.assertTrue(
+            from_excel.translation_flows.equals(from_frame.translation_flows)
+        )
+
+    def test_unchanged_plots_are_reused(self):
+        with tempfile.TemporaryDirectory() as out:
+            config = Configuration(
+                folder_data_out=out,
+                logic_order=DEFAULT_ORDER,
+                color_palette=COLOR_PALETTE,
+            )
+
+            def render(stamp):
+                viz = Viz(config, self.excel, stamp=stamp)
+                return next(render_plots(viz, ["hist"], cache=PlotCache(out)))
+
+            _, first, reused = render("a")
+            self.assertFalse(reused)
+            self.assertEqual(("hist", first, True), render("b"))
+
+            config.color_palette = {**COLOR_PALETTE, "LTL": "#000000"}
+            _, third, reused = render("c")
+            self.assertFalse(reused)
+            self.assertTrue(third.endswith("_c.pdf"))
+
+    def test_density_mode(self):
+        grid, density = _smoothed_density(np.random.default_rng(0).poisson(3, 10_000))
+        self.assertAlmostEqual(1.0, density.sum() * (grid[1] - grid[0]))
+
+        viz = Viz(self.config, self.excel, stamp="dense", density=True)
+        for plot in ("viol", "pair"):
+            self.assertTrue(os.path.isfile(viz.render(plot)), plot)
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from tlparser.config import Configuration
+from tlparser.workqueue import WorkQueue, run_worker
+
+TEST_JSON = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "data", "test.json")
+)
+CONFIG = Configuration(
+    only_with_status=["OK"],
+    logic_order=["INV", "LTL", "MTLb", "MITL", "TPTL", "CTLS", "STL"],
+)
+
+
+class _TakenOverQueue(WorkQueue):
+    """Lets another worker take over the first task before it is completed."""
+
+    taken_over = False
+
+    def complete(self, seq, worker, item, issues=None):
+        if not self.taken_over:
+            self.taken_over = True
+            self._conn.execute(
+                "UPDATE tasks SET owner = 'other', lease_expires = 0 WHERE seq = ?",
+                (seq,),
+            )
+        return super().complete(seq, worker, item, issues)
+
+
+class TestWorkQueue(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = WorkQueue(os.path.join(self.tmp.name, "queue.sqlite"))
+        self.count = self.queue.enqueue([TEST_JSON], CONFIG)
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_enqueue_creates_one_task_per_logic(self):
+        self.assertEqual(10, self.count)
+        self.assertEqual(10, self.queue.counts()["pending"])
+
+    def test_enqueue_twice_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.queue.enqueue([TEST_JSON], CONFIG)
+
+    def test_expired_lease_is_taken_over(self):
+        first = self.queue.claim("dead-worker", lease_seconds=-1)
+        second = self.queue.claim("live-worker", lease_seconds=60)
+        self.assertEqual(first["seq"], second["seq"])
+        self.assertFalse(self.queue.renew(first["seq"], "dead-worker", 60))
+
+    def test_worker_drains_queue_in_order(self):
+        processed, _ = run_worker(self.queue, worker="w1", poll_seconds=0)
+        self.assertEqual({"done": 10, "errors": 0}, processed)
+
+        items, issues = self.queue.results()
+        self.assertEqual([1, 1, 2, 2, 3, 3, 4, 4, 5, 5], [i["id"] for i in items])
+        self.assertEqual([], issues)
+        self.assertIsInstance(items[0]["stats"]["ap"], list)
+
+    def test_tasks_taken_over_are_not_counted(self):
+        queue = _TakenOverQueue(os.path.join(self.tmp.name, "taken.sqlite"))
+        try:
+            queue.enqueue([TEST_JSON], CONFIG)
+            processed, _ = run_worker(queue, worker="w1", poll_seconds=0)
+            self.assertEqual(10, queue.counts()["done"])
+        finally:
+            queue.close()
+        self.assertEqual({"done": 10, "errors": 0}, processed)
+
+    def test_unparsable_formula_becomes_error_row(self):
+        with open(TEST_JSON) as fh:
+            data = json.load(fh)
+        data[0]["logics"][0]["f_code"] = "G(p -->)"
+        broken = os.path.join(self.tmp.name, "broken.json")
+        with open(broken, "w") as fh:
+            json.dump(data, fh)
+        queue = WorkQueue(os.path.join(self.tmp.name, "broken.sqlite"))
+        try:
+            queue.enqueue([broken], CONFIG)
+            processed, _ = run_worker(queue, worker="w1", poll_seconds=0)
+            self.assertEqual({"done": 10, "errors": 1}, processed)
+            self.assertEqual(10, queue.counts()["done"])
+            items, _ = queue.results()
+        finally:
+            queue.close()
+        self.assertEqual(10, len(items))
+        self.assertTrue(items[0]["error"].startswith("UnexpectedToken"))
@@ -0,0 +1,15 @@
+"""Temporal Logic Parser.
+
+The library API (:func:`analyze`, :func:`analyze_many` and :func:`iter_digest`)
+is imported on first use so that ``import tlparser`` and the CLI stay fast.
+"""
+
+__all__ = ["analyze", "analyze_many", "iter_digest"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from tlparser import api
+
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
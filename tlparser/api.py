@@ -0,0 +1,179 @@
+"""Public Python API for embedding tlparser in other pipelines.
+
+All functions return plain dicts in the shape the CLI writes and produce them
+lazily, so large inputs can be streamed without materialising every result.
+Options mirror the CLI: ``extended`` adds the Spot-based columns, ``jobs``
+analyses several formulas concurrently (useful with ``extended``, whose Spot
+tools run as subprocesses), and ``cache`` shares one warm Spot analyzer and
+its result cache across calls (and makes :func:`iter_digest` analyze each
+distinct formula only once).
+
+>>> import tlparser
+>>> tlparser.analyze("G (req --> F ack)")["agg"]
+{'aps': 2, 'cops': 0, 'lops': 1, 'tops': 2}
+"""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Mapping, Sequence, TypeVar, Union
+
+from tlparser.config import DEFAULT_ORDER, DEFAULT_STATI, Configuration
+from tlparser.stats import Stats, StatsCache
+from tlparser.stats_ext import SpotAnalyzer
+from tlparser.utils import Utils
+
+__all__ = ["analyze", "analyze_many", "iter_digest"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+FormulaInput = Union[str, Sequence[str], Mapping[str, str]]
+
+
+@lru_cache(maxsize=None)
+def _shared_spot_analyzer(verbose: bool) -> SpotAnalyzer:
+    return SpotAnalyzer(verbose=verbose)
+
+
+def _resolve_spot_analyzer(
+    extended: bool, verbose: bool, cache: bool, spot_analyzer: SpotAnalyzer | None
+) -> SpotAnalyzer | None:
+    if not extended:
+        return None
+    if spot_analyzer is not None:
+        return spot_analyzer
+    return _shared_spot_analyzer(verbose) if cache else SpotAnalyzer(verbose=verbose)
+
+
+def _ordered_map(func: Callable[[T], R], items: Iterable[T], jobs: int) -> Iterator[R]:
+    """Lazily map ``func`` over ``items`` on ``jobs`` threads, keeping input order.
+
+    At most ``2 * jobs`` items are in flight, so unbounded inputs are fine.
+    """
+    if jobs <= 1:
+        yield from map(func, items)
+        return
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending: deque = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def analyze(
+    formula: str,
+    text: str | None = None,
+    *,
+    extended: bool = False,
+    verbose: bool = False,
+    cache: bool = True,
+    spot_analyzer: SpotAnalyzer | None = None,
+) -> dict:
+    """Analyze a single formula; returns the same object as ``tlparser evaluate``.
+
+    Raises the parser's exception if the formula cannot be parsed.
+    """
+    stats = Stats(
+        formula_str=formula.strip(),
+        req_text=text,
+        extended=extended,
+        spot_analyzer=_resolve_spot_analyzer(extended, verbose, cache, spot_analyzer),
+        spot_verbose=verbose,
+    )
+    return stats.as_serializable()
+
+
+def analyze_many(
+    formulas: Iterable[FormulaInput],
+    *,
+    jobs: int = 1,
+    extended: bool = False,
+    verbose: bool = False,
+    cache: bool = True,
+    spot_analyzer: SpotAnalyzer | None = None,
+) -> Iterator[dict]:
+    """Analyze formulas lazily, yielding one result per input in input order.
+
+    Each input is a formula string, a ``(formula, text)`` pair or a mapping
+    with ``formula`` and optional ``text`` keys. Formulas that cannot be
+    analysed yield ``{"formula_raw": ..., "error": ...}`` instead of raising.
+    """
+    analyzer = _resolve_spot_analyzer(extended, verbose, cache, spot_analyzer)
+
+    def analyze_one(formula_input: FormulaInput) -> dict:
+        if isinstance(formula_input, str):
+            formula, text = formula_input, None
+        elif isinstance(formula_input, Mapping):
+            formula, text = formula_input["formula"], formula_input.get("text")
+        else:
+            formula, text = formula_input
+        try:
+            return analyze(
+                formula,
+                text,
+                extended=extended,
+                verbose=verbose,
+                spot_analyzer=analyzer,
+            )
+        except Exception as exc:  # noqa: BLE001 - reported in the result
+            return {"formula_raw": formula, "error": f"{type(exc).__name__}: {exc}"}
+
+    return _ordered_map(analyze_one, formulas, jobs)
+
+
+def iter_digest(
+    source: str | os.PathLike | Iterable[dict],
+    *,
+    statuses: Sequence[str] = DEFAULT_STATI,
+    logic_order: Sequence[str] = DEFAULT_ORDER,
+    jobs: int = 1,
+    extended: bool = False,
+    verbose: bool = False,
+    cache: bool = True,
+    spot_analyzer: SpotAnalyzer | None = None,
+    shard: tuple[int, int] | None = None,
+) -> Iterator[dict]:
+    """Digest a JSON file or in-memory entries, yielding one row per logic.
+
+    ``source`` is either the path of a digest JSON file or an iterable of
+    entries in that format. Rows have the same (nested) shape as the rows of
+    ``tlparser digest`` and arrive in file order; rows of formulas that cannot
+    be analysed carry an ``error`` key. ``shard=(i, n)`` restricts the digest
+    to shard ``i`` of ``n`` as ``digest --shard`` does.
+    """
+    is_path = isinstance(source, (str, os.PathLike))
+    util = Utils(
+        Configuration(
+            file_data_in=os.fspath(source) if is_path else "",
+            only_with_status=list(statuses),
+            logic_order=list(logic_order),
+        )
+    )
+    data = util.load_entries() if is_path else source
+    analyzer = _resolve_spot_analyzer(extended, verbose, cache, spot_analyzer)
+    stats_cache = StatsCache() if cache else None
+
+    def digest_one(task: tuple[int, dict, dict]) -> dict:
+        seq, entry, logic = task
+        try:
+            item = Utils.analyze_logic(
+                entry,
+                logic,
+                extended=extended,
+                spot_analyzer=analyzer,
+                verbose=verbose,
+                cache=stats_cache,
+            )
+        except Exception as exc:  # noqa: BLE001 - keep the digest going
+            item = Utils.error_item(entry, logic, exc)
+        if shard is not None:
+            item["seq"] = seq
+        return Utils.serialize_item(item)
+
+    return _ordered_map(digest_one, util.iter_tasks(data, shard), jobs)
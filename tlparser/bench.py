@@ -0,0 +1,274 @@
+"""Reproducible throughput benchmarks behind ``tlparser bench``.
+
+Every scenario runs on the requirement entries of one dataset (a digest JSON
+file, or a synthetic corpus scaled up from one) and reports its throughput in
+formulas per second, p50/p95 latency and peak RSS. Per-formula scenarios
+(``parse``, ``stats``, ``spot``) time every formula; whole-run scenarios
+(``digest-*`` and ``viz-*``) time each repetition, so their latency is the
+wall time of one run over the dataset.
+
+By default each scenario runs in a freshly spawned process, so its peak RSS
+is not inflated by the scenarios before it.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib import metadata
+
+from tlparser.config import (
+    BENCH_SCENARIOS,
+    COLOR_PALETTE,
+    DEFAULT_ORDER,
+    DEFAULT_STATI,
+    Configuration,
+)
+from tlparser.profiling import percentile
+from tlparser.stats import Stats, StatsCache, get_parser
+from tlparser.utils import Utils
+
+SCENARIOS = BENCH_SCENARIOS
+
+# Lowercase identifiers are propositions or variables; these are operators
+_IDENTIFIER = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*\b")
+# Operators and constants; every other identifier is (part of) a proposition
+_KEYWORDS = {"and", "or", "not", "true", "false", "TRUE", "FALSE"}
+_KEYWORDS.update("GFXURWAE")
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MiB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def load_dataset(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def scaled_corpus(entries: list[dict], factor: int) -> list[dict]:
+    """Repeat a corpus factor times with fresh ids and renamed propositions.
+
+    Copy k renames every identifier ``x`` other than an operator or constant
+    to ``x_k``, whatever its case, so the copies parse to the same shapes but
+    are distinct formulas that the digest cache and Spot's per-formula results
+    cannot collapse.
+    """
+
+    def rename(formula: str, copy: int) -> str:
+        if copy == 0:
+            return formula
+        return _IDENTIFIER.sub(
+            lambda m: m.group() if m.group() in _KEYWORDS else f"{m.group()}_{copy}",
+            formula,
+        )
+
+    id_span = max((entry["id"] for entry in entries), default=0)
+    return [
+        {
+            **entry,
+            "id": entry["id"] + copy * id_span,
+            "logics": [
+                {**logic, "f_code": rename(logic["f_code"], copy)}
+                for logic in entry["logics"]
+            ],
+        }
+        for copy in range(factor)
+        for entry in entries
+    ]
+
+
+def _formulas(entries: list[dict]) -> list[tuple[str, str]]:
+    """(formula, requirement text) of every non-empty formula a digest analyses"""
+    return [
+        (logic["f_code"].strip(), entry["text"])
+        for entry in entries
+        if entry["status"] in DEFAULT_STATI
+        for logic in entry["logics"]
+        if logic["f_code"].strip()
+    ]
+
+
+def _time_each(func, items) -> tuple[list[float], int]:
+    """Per-item latencies of func over items, and the number of items that raised"""
+    latencies = []
+    errors = 0
+    for item in items:
+        started = time.perf_counter()
+        try:
+            func(item)
+        except Exception:  # noqa: BLE001 - unparsable formulas are part of the data
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+
+def _config(folder: str) -> Configuration:
+    return Configuration(
+        folder_data_out=folder,
+        only_with_status=DEFAULT_STATI,
+        logic_order=DEFAULT_ORDER,
+        color_palette=COLOR_PALETTE,
+    )
+
+
+def _digest(util: Utils, entries: list[dict]) -> list[dict]:
+    return util.read_formulas_from_json(entries=entries, cache=StatsCache())
+
+
+def run_scenario(scenario: str, entries: list[dict], repeat: int = 1) -> dict:
+    """Run one scenario repeat times on entries and summarise its timings"""
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    get_parser()  # Build the parser tables once, outside all timings
+    result: dict = {"scenario": scenario}
+    latencies: list[float] = []
+    runs: list[float] = []
+    errors = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        util = Utils(_config(tmp))
+
+        if scenario in ("parse", "stats", "spot"):
+            formulas = _formulas(entries)
+            if scenario == "parse":
+
+                def analyse(item):
+                    _, parsable = Stats.analyse_comparison_ops(item[0])
+                    get_parser()(parsable)
+
+            elif scenario == "stats":
+
+                def analyse(item):
+                    Stats(item[0], item[1]).get_stats()
+
+            else:
+                from tlparser.stats_ext import SpotAnalyzer
+
+                if not SpotAnalyzer().warm_up():
+                    return {**result, "skipped": "Spot CLI tools not found"}
+            for _ in range(repeat):
+                if scenario == "spot":
+                    # A fresh analyzer per run, so runs do not reuse each other's results
+                    analyzer = SpotAnalyzer()
+
+                    def analyse(item):
+                        Stats(item[0], item[1], extended=True, spot_analyzer=analyzer)
+
+                started = time.perf_counter()
+                run_latencies, errors = _time_each(analyse, formulas)
+                runs.append(time.perf_counter() - started)
+                latencies.extend(run_latencies)
+            count = len(formulas)
+            result["latency"] = "formula"
+
+        elif scenario.startswith("digest-"):
+            fmt = scenario.split("-", 1)[1]
+            import openpyxl  # noqa: F401 - keep import time out of the timings
+            import pandas  # noqa: F401
+
+            for run in range(repeat):
+                started = time.perf_counter()
+                rows = _digest(util, entries)
+                if fmt == "xlsx":
+                    util.write_to_excel(rows, prefix=f"bench{run}")
+                elif fmt == "json":
+                    path = os.path.join(tmp, f"bench{run}.json")
+                    with open(path, "w", encoding="utf-8") as fh:
+                        json.dump([Utils.serialize_item(row) for row in rows], fh)
+                else:
+                    util.to_dataframe(rows)
+                runs.append(time.perf_counter() - started)
+            count = len(rows)
+            errors = len(util.failures)
+            latencies = runs
+            result["latency"] = "run"
+
+        else:
+            from tlparser.viz import Viz
+
+            plot = scenario.split("-", 1)[1]
+            rows = _digest(util, entries)
+            frame = util.to_dataframe(rows)
+            for run in range(repeat):
+                started = time.perf_counter()
+                viz = Viz(util.config, frame, plots=[plot], stamp=f"bench{run}")
+                viz.render(plot)
+                viz.exports.close()
+                runs.append(time.perf_counter() - started)
+            count = len(rows)
+            latencies = runs
+            result["latency"] = "run"
+
+    seconds = statistics.median(runs)
+    result.update(
+        formulas=count,
+        errors=errors,
+        repeat=repeat,
+        seconds=round(seconds, 6),
+        formulas_per_sec=round(count / seconds, 3) if seconds else None,
+        p50_ms=round(percentile(latencies, 50) * 1000, 4) if latencies else None,
+        p95_ms=round(percentile(latencies, 95) * 1000, 4) if latencies else None,
+        peak_rss_mb=peak_rss_mb(),
+    )
+    return result
+
+
+def _run_isolated(scenario: str, entries: list[dict], repeat: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_scenario, scenario, entries, repeat).result()
+
+
+def _version() -> str:
+    try:
+        return metadata.version("tlparser")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def run_benchmarks(
+    datasets: dict[str, list[dict]],
+    scenarios=SCENARIOS,
+    *,
+    repeat: int = 1,
+    isolate: bool = True,
+    on_result=None,
+) -> dict:
+    """Run every scenario on every dataset and return the JSON-ready report"""
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tlparser": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "isolated": isolate,
+        "results": [],
+    }
+    for name, entries in datasets.items():
+        for scenario in scenarios:
+            if isolate:
+                result = _run_isolated(scenario, entries, repeat)
+            else:
+                result = run_scenario(scenario, entries, repeat)
+            result = {"dataset": name, **result}
+            report["results"].append(result)
+            if on_result is not None:
+                on_result(result)
+    return report
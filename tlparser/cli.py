@@ -1,36 +1,40 @@
+import glob
 import json
 import os
+import re
 import shutil
 import sys
-from contextlib import nullcontext
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
 
 import click
 
-from tlparser.config import Configuration
+from tlparser import profiling
+from tlparser.config import (
+    BENCH_SCENARIOS,
+    COLOR_PALETTE,
+    DEFAULT_ORDER,
+    DEFAULT_STATI,
+    Configuration,
+)
+from tlparser.journal import Journal
+from tlparser.stats import StatsCache
+from tlparser.stats_ext import SpotAnalyzer
 from tlparser.utils import Utils
-from tlparser.viz import Viz
 
 DEFAULT_WD = "workingdir"
-DEFAULT_STATI = ["OK"]
-DEFAULT_ORDER = ["INV", "LTL", "MTLb", "MITL", "TPTL", "CTLS", "STL"]
-DEFAULT_COLOR = [
-    "#687dd6",
-    "#56ac67",
-    "#ba543d",
-    "#20d8fd",
-    "#8750a6",
-    "#696969",
-    "#ac9c3d",
-]
-COLOR_PALETTE = dict(zip(DEFAULT_ORDER, DEFAULT_COLOR))
+
+
+def default_working_directory():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_WD)
 
 
 def get_working_directory(custom_working_dir=None):
     """Get or create the working directory"""
 
-    script_location = os.path.dirname(os.path.abspath(__file__))
     working_dir = (
-        os.path.join(script_location, DEFAULT_WD)
+        default_working_directory()
         if custom_working_dir is None
         else custom_working_dir
     )
@@ -52,8 +56,142 @@ def cli():
     """Temporal Logic Parser"""
 
 
+class LockedProgress:
+    """Serialize progress updates coming from several worker threads"""
+
+    def __init__(self, progress):
+        self._progress = progress
+        self._lock = threading.Lock()
+
+    def update(self, n):
+        with self._lock:
+            self._progress.update(n)
+
+
+@contextmanager
+def profiling_session(command, folder):
+    """Time the stages of a command; report them on stderr and in a JSON file"""
+    profiler = profiling.enable()
+    try:
+        with profiling.stage(command):
+            yield profiler
+    finally:
+        profiling.disable()
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(
+            folder, f"{command}_{Utils.get_unique_filename()}_profile.json"
+        )
+        profiler.save(path)
+        click.echo(f"Stage timings of '{command}':", err=True)
+        click.echo(profiler.format(), err=True)
+        click.echo(f"Saved profile to {path}", err=True)
+
+
+def parse_shard(ctx, param, value):
+    """Parse an 'I/N' shard specification into a (index, count) tuple"""
+    if value is None:
+        return None
+    match = re.fullmatch(r"(\d+)/(\d+)", value.strip())
+    if not match or not 1 <= int(match[1]) <= int(match[2]):
+        raise click.BadParameter(
+            "Expected I/N with 1 <= I <= N, e.g. '2/4'.", ctx=ctx, param=param
+        )
+    return int(match[1]), int(match[2])
+
+
+def parse_weights(ctx, param, value):
+    """Parse repeated 'KEY=WEIGHT' options into a {key: weight} dict"""
+    weights = {}
+    for item in value:
+        key, sep, weight = item.partition("=")
+        try:
+            weights[key.strip()] = float(weight)
+        except ValueError:
+            sep = ""
+        if not sep or not key.strip() or weights[key.strip()] < 0:
+            raise click.BadParameter(
+                f"Expected KEY=WEIGHT with a non-negative weight, got '{item}'.",
+                ctx=ctx,
+                param=param,
+            )
+    return weights
+
+
+def expand_input_paths(patterns):
+    """Expand file paths and glob patterns, keeping the given order"""
+    paths = []
+    for pattern in patterns:
+        matches = [pattern] if os.path.exists(pattern) else sorted(glob.glob(pattern))
+        if not matches:
+            raise click.BadParameter(
+                f"No file matches '{pattern}'.", param_hint="JSON_FILES"
+            )
+        for match in matches:
+            if os.path.abspath(match) not in map(os.path.abspath, paths):
+                paths.append(match)
+    return paths
+
+
+def output_prefixes(paths):
+    """Output name prefix of every input file, unique where basenames clash"""
+    names = [Utils.extract_filename_without_suffix(path) for path in paths]
+    return [
+        f"{name}_{Utils.path_digest(path)}" if names.count(name) > 1 else name
+        for name, path in zip(names, paths)
+    ]
+
+
+PLOT_TYPES = ["hist", "viol", "pair", "chord", "sankey", "dag", "all"]
+
+
+def render_visualizations(
+    source, plot, *, working_dir, selfonly=False, jobs=1, cache=True, density="auto"
+):
+    """Render the requested plot types of a digest Excel file or DataFrame"""
+    from tlparser.plot_cache import PlotCache
+    from tlparser.viz import Viz, render_plots
+
+    config = Configuration(
+        folder_data_out=working_dir,
+        logic_order=DEFAULT_ORDER,
+        color_palette=COLOR_PALETTE,
+    )
+    if "all" in plot or not plot:
+        plot = Viz.plot_methods.keys()
+    plot = list(dict.fromkeys(plot))
+
+    # Read the columns of the digest the plots need
+    density = {"auto": None, "on": True, "off": False}[density.lower()]
+    viz = Viz(config, source, selfonly, plots=plot, density=density)
+
+    if jobs > 1 and len(plot) > 1:
+        click.echo(f"Generating {len(plot)} plots on {min(jobs, len(plot))} processes...")
+    plot_cache = PlotCache(config.folder_data_out) if cache else None
+    try:
+        for pt, _, reused in render_plots(viz, plot, jobs=jobs, cache=plot_cache):
+            click.echo(
+                f"Reused unchanged {pt} plot." if reused else f"Generated {pt} plot."
+            )
+    finally:
+        viz.exports.close()
+
+
+def write_output(util, formulas, prefix, source, plots_only=False):
+    """Write the digest to Excel, or only name it when just plots are wanted"""
+    if plots_only:
+        # Reports next to the output still need a name
+        out_file = os.path.join(
+            util.config.folder_data_out, f"{prefix}_{util.get_unique_filename()}.xlsx"
+        )
+        click.echo(f"Processed {source} without writing an Excel file")
+        return out_file
+    out_file = util.write_to_excel(formulas, prefix=prefix)
+    click.echo(f"Processed {source} and saved results to {out_file}")
+    return out_file
+
+
 @cli.command(name="digest")
-@click.argument("json_file", type=click.Path(exists=True))
+@click.argument("json_files", nargs=-1, required=True)
 @click.option(
     "--output",
     "-o",
@@ -72,44 +210,436 @@ def cli():
     is_flag=True,
     help="Show Spot CLI progress when using --extended.",
 )
-def digest_file(json_file, output, extended, verbose):
-    """Processes the JSON file and outputs a CSV"""
+@click.option(
+    "--merge",
+    "-m",
+    is_flag=True,
+    help="Write one merged output with a 'source' column instead of one per file.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of input files processed concurrently.",
+)
+@click.option(
+    "--shard",
+    callback=parse_shard,
+    default=None,
+    metavar="I/N",
+    help="Only digest shard I of N (1-based); combine shards with 'tlparser merge'.",
+)
+@click.option(
+    "--queue",
+    "queue_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Only enqueue tasks into this SQLite work queue for 'tlparser worker'.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted digest from its checkpoint journal.",
+)
+@click.option(
+    "--checkpoint-every",
+    type=click.IntRange(min=1),
+    default=25,
+    show_default=True,
+    help="Force checkpointed rows to disk after this many rows.",
+)
+@click.option(
+    "--plot",
+    "-p",
+    type=click.Choice(PLOT_TYPES, case_sensitive=False),
+    multiple=True,
+    help="Also render these plot types straight from the digested results.",
+)
+@click.option(
+    "--plots-only",
+    is_flag=True,
+    help="Only render the --plot types and skip writing the Excel file.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report per-stage timings on stderr and in a JSON file next to the output.",
+)
+def digest_file(
+    json_files,
+    output,
+    extended,
+    verbose,
+    merge,
+    jobs,
+    shard,
+    queue_path,
+    resume,
+    checkpoint_every,
+    plot,
+    plots_only,
+    profile,
+):
+    """Processes the JSON file(s) and outputs an Excel file"""
+    json_files = expand_input_paths(json_files)
+    if plots_only and not plot:
+        raise click.UsageError("--plots-only requires at least one --plot.")
+    if queue_path is not None:
+        from tlparser.workqueue import WorkQueue
+
+        config = Configuration(only_with_status=DEFAULT_STATI, logic_order=DEFAULT_ORDER)
+        queue = WorkQueue(queue_path)
+        try:
+            count = queue.enqueue(json_files, config, extended=extended, shard=shard)
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+        finally:
+            queue.close()
+        click.echo(f"Enqueued {count} tasks into {queue_path}")
+        return
+
     working_dir = get_working_directory(output)
-    config = Configuration(
-        file_data_in=json_file,
-        folder_data_out=working_dir,
-        only_with_status=DEFAULT_STATI,
-        logic_order=DEFAULT_ORDER,
-    )
-    util = Utils(config)
+    if profile:
+        click.get_current_context().with_resource(
+            profiling_session("digest", working_dir)
+        )
+    utils = [
+        Utils(
+            Configuration(
+                file_data_in=json_file,
+                folder_data_out=working_dir,
+                only_with_status=DEFAULT_STATI,
+                logic_order=DEFAULT_ORDER,
+            )
+        )
+        for json_file in json_files
+    ]
+    entries = [util.load_entries() for util in utils]
+    shard_suffix = f"_shard{shard[0]}of{shard[1]}" if shard else ""
+    prefixes = output_prefixes(json_files)
+    settings = {"extended": extended, "shard": shard, "statuses": DEFAULT_STATI}
+    journals = [
+        Journal(
+            Journal.path_for(
+                working_dir,
+                Utils.extract_filename_without_suffix(json_file) + shard_suffix,
+                source=json_file,
+            ),
+            settings=settings,
+            sync_every=checkpoint_every,
+        )
+        for json_file in json_files
+    ]
+    opened = []
+    try:
+        for journal in journals:
+            journal.open(resume=resume)
+            opened.append(journal)
+    except (FileExistsError, ValueError) as exc:
+        # Leave journals of earlier runs alone, but not the ones created here
+        for journal in opened:
+            if journal.created:
+                journal.remove()
+            else:
+                journal.close()
+        raise click.ClickException(str(exc))
+    restored = sum(len(journal.completed) for journal in journals)
+    if restored:
+        click.echo(f"Resuming with {restored} rows restored from checkpoint journals.")
+    total = sum(util.count_formulas(data, shard) for util, data in zip(utils, entries))
+    # One analyzer for all files so Spot discovery and results are shared
+    spot_analyzer = SpotAnalyzer(verbose=verbose) if extended else None
+    # Identical formulas are analyzed once and fanned out to all their rows
+    cache = StatsCache()
     label = "Spot classification" if extended else "Processing formulas"
 
-    def progress_factory(total: int):
-        if total <= 0:
-            return nullcontext()
-        return click.progressbar(length=total, label=label, show_pos=True)
+    progress_cm = nullcontext()
+    if total > 0:
+        progress_cm = click.progressbar(length=total, label=label, show_pos=True)
 
-    formulas = util.read_formulas_from_json(
-        extended=extended,
-        verbose=verbose,
-        progress_factory=progress_factory,
+    with ExitStack() as stack:
+        for journal in journals:
+            stack.enter_context(journal)
+        progress = stack.enter_context(progress_cm)
+        shared_progress = LockedProgress(progress) if progress is not None else None
+        # Set on Ctrl-C so worker threads stop after their current row
+        stop = threading.Event()
+
+        def digest_one(util, data, journal):
+            return util.read_formulas_from_json(
+                extended=extended,
+                verbose=verbose,
+                progress_factory=lambda _total: nullcontext(shared_progress),
+                spot_analyzer=spot_analyzer,
+                entries=data,
+                shard=shard,
+                journal=journal,
+                cache=cache,
+                stop=stop,
+            )
+
+        if jobs == 1:
+            # In the main thread, Ctrl-C interrupts the digest right away
+            results = list(map(digest_one, utils, entries, journals))
+        else:
+            pool = ThreadPoolExecutor(max_workers=jobs)
+            try:
+                results = list(pool.map(digest_one, utils, entries, journals))
+            except KeyboardInterrupt:
+                stop.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            pool.shutdown()
+
+    if cache.lookups:
+        click.echo(
+            f"Analyzed {cache.misses} distinct formulas for {cache.lookups} rows "
+            f"(dedup hit ratio {cache.hit_ratio:.1%})"
+        )
+    if spot_analyzer is not None and spot_analyzer.lookups:
+        click.echo(
+            f"Ran {spot_analyzer.pipeline_runs} Spot pipelines for "
+            f"{spot_analyzer.lookups} formulas (formulas of the same shape share one)"
+        )
+    if spot_analyzer is not None and spot_analyzer.skipped:
+        reasons = ", ".join(
+            f"{reason}: {count}" for reason, count in sorted(spot_analyzer.skipped.items())
+        )
+        click.echo(f"Skipped Spot for formulas outside its LTL fragment ({reasons})")
+
+    warnings = []
+    for util in utils:
+        warnings.extend(w for w in util.warnings if w not in warnings)
+    for warning in warnings:
+        click.echo(warning, err=True)
+
+    if merge:
+        merged = Utils(utils[0].config)
+        formulas = []
+        offset = 0
+        for util, data, file_formulas in zip(utils, entries, results):
+            source = util.config.file_data_in
+            for item in file_formulas:
+                if shard:
+                    # Number rows across all files, as a single-node merge would
+                    item["seq"] += offset
+                formulas.append({"source": source, **item})
+            offset += util.count_formulas(data)
+            merged.spot_issues.extend(
+                issue for issue in util.spot_issues if issue not in merged.spot_issues
+            )
+            merged.failures.extend(
+                {"source": source, **item} for item in util.failures
+            )
+        out_file = write_output(
+            merged,
+            formulas,
+            "merged" + shard_suffix,
+            f"{len(json_files)} files (merged)",
+            plots_only,
+        )
+        outputs = [(merged, formulas, out_file)]
+    else:
+        outputs = []
+        for util, formulas, prefix in zip(utils, results, prefixes):
+            out_file = write_output(
+                util, formulas, prefix + shard_suffix, util.config.file_data_in, plots_only
+            )
+            outputs.append((util, formulas, out_file))
+
+    # Plots are rendered from the results in memory, not from the Excel file
+    for util, formulas, out_file in outputs:
+        if not plot or not formulas:
+            continue
+        render_visualizations(util.to_dataframe(formulas), plot, working_dir=working_dir)
+
+    # The output is on disk, so the checkpoints are no longer needed
+    for journal in journals:
+        journal.remove()
+
+    for util, formulas, out_file in outputs:
+        if util.spot_issues:
+            issue_path = os.path.splitext(out_file)[0] + "_errors.md"
+            util.save_spot_issue_report(issue_path)
+            count = len(util.spot_issues)
+            click.echo(
+                f"{count} out of {len(formulas)} formulae reported Spot issues; see {issue_path}",
+                err=True,
+            )
+
+        util.echo_spot_summary(util.spot_issues, total=len(formulas))
+
+    failed = 0
+    for util, formulas, out_file in outputs:
+        if util.failures:
+            failure_path = os.path.splitext(out_file)[0] + "_failed.md"
+            util.save_failure_report(failure_path)
+            failed += len(util.failures)
+            click.echo(
+                f"{len(util.failures)} out of {len(formulas)} formulae could not be analysed; see {failure_path}",
+                err=True,
+            )
+    if failed:
+        # The exit status reflects the failure count (capped below shell codes)
+        sys.exit(min(failed, 125))
+
+
+@cli.command(name="merge")
+@click.argument("shard_files", nargs=-1, required=True)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(writable=True),
+    default=None,
+    help="Path to the output directory.",
+)
+def merge_shards(shard_files, output):
+    """Combines the outputs of 'digest --shard' into one Excel file"""
+    shard_files = expand_input_paths(shard_files)
+    names = [Utils.extract_filename_without_suffix(f) for f in shard_files]
+    matches = [re.fullmatch(r"(.+)_shard(\d+)of(\d+)_\d+", name) for name in names]
+
+    prefix = "merged"
+    if all(matches):
+        prefixes = {m[1] for m in matches}
+        counts = {int(m[3]) for m in matches}
+        if len(prefixes) == 1:
+            prefix = prefixes.pop()
+        if len(counts) == 1:
+            count = counts.pop()
+            absent = sorted(set(range(1, count + 1)) - {int(m[2]) for m in matches})
+            if absent:
+                click.echo(
+                    f"Missing shard(s) {', '.join(map(str, absent))} of {count}.",
+                    err=True,
+                )
+
+    working_dir = get_working_directory(output)
+    util = Utils(Configuration(folder_data_out=working_dir, logic_order=DEFAULT_ORDER))
+    try:
+        rows, missing = util.merge_shards(shard_files)
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+    if missing:
+        click.echo(f"{len(missing)} rows are not covered by any shard.", err=True)
+    out_file = util.write_rows_to_excel(rows, prefix=prefix)
+    click.echo(f"Merged {len(shard_files)} shards and saved results to {out_file}")
+
+
+@cli.command(name="worker")
+@click.argument("queue_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--lease",
+    type=click.FloatRange(min=1),
+    default=1800,
+    show_default=True,
+    help="Seconds a claimed task stays reserved; renewed while it is processed.",
+)
+@click.option(
+    "--poll",
+    type=click.FloatRange(min=0),
+    default=5,
+    show_default=True,
+    help="Seconds to wait before re-checking tasks leased by other workers.",
+)
+@click.option(
+    "--max-tasks",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stop after processing this many tasks.",
+)
+@click.option(
+    "--verbose",
+    "-v",
+    is_flag=True,
+    help="Show Spot CLI progress for extended queues.",
+)
+def queue_worker(queue_path, lease, poll, max_tasks, verbose):
+    """Processes tasks of a work queue created with 'digest --queue'"""
+    from tlparser.workqueue import WorkQueue, default_worker_name, run_worker
+
+    worker = default_worker_name()
+    queue = WorkQueue(queue_path)
+    try:
+        processed, warnings = run_worker(
+            queue,
+            worker=worker,
+            lease_seconds=lease,
+            poll_seconds=poll,
+            max_tasks=max_tasks,
+            verbose=verbose,
+        )
+    finally:
+        queue.close()
+    for warning in warnings:
+        click.echo(warning, err=True)
+    click.echo(
+        f"Worker {worker} finished: {processed['done']} done "
+        f"({processed['errors']} could not be analysed)"
     )
-    if util.warnings:
-        for warning in util.warnings:
-            click.echo(warning, err=True)
-    out_file = util.write_to_excel(formulas)
-    click.echo(f"Processed {json_file} and saved results to {out_file}")
+
+
+@cli.command(name="collect")
+@click.argument("queue_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(writable=True),
+    default=None,
+    help="Path to the output directory.",
+)
+@click.option(
+    "--partial",
+    is_flag=True,
+    help="Write the completed tasks even if some are still open.",
+)
+def collect_queue(queue_path, output, partial):
+    """Assembles the results of a work queue into an Excel file"""
+    from tlparser.workqueue import WorkQueue
+
+    queue = WorkQueue(queue_path)
+    try:
+        counts = queue.counts()
+        open_tasks = counts["pending"] + counts["leased"]
+        if open_tasks and not partial:
+            raise click.ClickException(
+                f"{open_tasks} tasks are not done ({counts}); use --partial to collect anyway."
+            )
+        formulas, spot_issues = queue.results()
+        sources = queue.get_meta("sources", [])
+        logic_order = queue.get_meta("logic_order", DEFAULT_ORDER)
+    finally:
+        queue.close()
+
+    working_dir = get_working_directory(output)
+    util = Utils(Configuration(folder_data_out=working_dir, logic_order=logic_order))
+    util.spot_issues = spot_issues
+    util.failures = [item for item in formulas if item.get("error")]
+    prefix = (
+        Utils.extract_filename_without_suffix(sources[0])
+        if len(sources) == 1
+        else "merged"
+    )
+    out_file = util.write_to_excel(formulas, prefix=prefix)
+    click.echo(f"Collected {len(formulas)} results and saved them to {out_file}")
 
     if util.spot_issues:
         issue_path = os.path.splitext(out_file)[0] + "_errors.md"
         util.save_spot_issue_report(issue_path)
-        count = len(util.spot_issues)
         click.echo(
-            f"{count} out of {len(formulas)} formulae reported Spot issues; see {issue_path}",
+            f"{len(util.spot_issues)} out of {len(formulas)} formulae reported Spot issues; see {issue_path}",
             err=True,
         )
-
-    util.echo_spot_summary(util.spot_issues, total=len(formulas))
+    if util.failures:
+        failure_path = os.path.splitext(out_file)[0] + "_failed.md"
+        util.save_failure_report(failure_path)
+        click.echo(
+            f"{len(util.failures)} out of {len(formulas)} formulae could not be analysed; see {failure_path}",
+            err=True,
+        )
+        sys.exit(min(len(util.failures), 125))
 
 
 @cli.command(name="evaluate")
@@ -131,8 +661,43 @@ def digest_file(json_file, output, extended, verbose):
     default=None,
     help="Optional requirement text to include when computing stats.",
 )
-def evaluate_formula(formula_tokens, extended, verbose, requirement_text):
+@click.option(
+    "--batch",
+    "batch_file",
+    type=click.File("r", encoding="utf-8", lazy=False),
+    default=None,
+    help="Evaluate one formula or JSON object per line of FILE ('-' for stdin).",
+)
+@click.option(
+    "--stdin",
+    "read_stdin",
+    is_flag=True,
+    help="Same as '--batch -'.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report per-stage timings on stderr and in a JSON file in the working "
+    "directory.",
+)
+def evaluate_formula(
+    formula_tokens, extended, verbose, requirement_text, batch_file, read_stdin, profile
+):
     """Analyze a single formula and print the statistics."""
+    if profile:
+        # stdout carries the results, so the working directory is not announced
+        click.get_current_context().with_resource(
+            profiling_session("evaluate", default_working_directory())
+        )
+    if read_stdin:
+        batch_file = batch_file or click.open_file("-", encoding="utf-8")
+    if batch_file is not None:
+        if formula_tokens or requirement_text:
+            raise click.UsageError(
+                "A formula or --text cannot be combined with --batch/--stdin."
+            )
+        evaluate_batch(batch_file, extended=extended, verbose=verbose)
+        return
     if not formula_tokens:
         raise click.UsageError("Provide a formula to evaluate.")
 
@@ -162,6 +727,101 @@ def evaluate_formula(formula_tokens, extended, verbose, requirement_text):
     util.echo_spot_summary(util.spot_issues, total=1)
 
 
+def evaluate_batch(lines, *, extended, verbose):
+    """Write one JSON result per input line (NDJSON) as soon as it is ready"""
+    util = Utils(Configuration(logic_order=DEFAULT_ORDER))
+    total = failed = 0
+    for result in util.iter_evaluate(lines, extended=extended, verbose=verbose):
+        # click.echo flushes, so consumers see every result immediately
+        click.echo(json.dumps(result, sort_keys=True))
+        total += 1
+        failed += "error" in result
+
+    for warning in util.warnings:
+        click.echo(warning, err=True)
+    util.echo_spot_summary(util.spot_issues, total=total)
+    if failed:
+        click.echo(f"{failed} out of {total} formulae could not be analysed.", err=True)
+        sys.exit(min(failed, 125))
+
+
+@cli.command(name="serve")
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    show_default=True,
+    help="Interface to listen on.",
+)
+@click.option(
+    "--port",
+    type=click.IntRange(min=0, max=65535),
+    default=8765,
+    show_default=True,
+    help="TCP port to listen on (0 picks a free port).",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Listen on this Unix socket instead of a TCP port.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=lambda: min(32, (os.cpu_count() or 1) + 4),
+    show_default="min(32, CPUs + 4)",
+    help="Number of requests handled concurrently.",
+)
+@click.option(
+    "--extended",
+    is_flag=True,
+    help="Compute Spot-based extended columns unless a request disables them.",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=0),
+    default=4096,
+    show_default=True,
+    help="Number of evaluate responses kept in memory.",
+)
+@click.option(
+    "--verbose",
+    "-v",
+    is_flag=True,
+    help="Log every request and show Spot CLI progress.",
+)
+def serve(host, port, socket_path, workers, extended, cache_size, verbose):
+    """Serves formula analysis over a local HTTP/JSON API"""
+    from tlparser.server import AnalysisServer, AnalysisService, UnixAnalysisServer
+
+    service = AnalysisService(
+        logic_order=DEFAULT_ORDER,
+        only_with_status=DEFAULT_STATI,
+        extended=extended,
+        verbose=verbose,
+        cache_size=cache_size,
+    )
+    service.warm_up()
+    if socket_path is not None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Stale socket of a previous server
+        server = UnixAnalysisServer(socket_path, service, workers=workers)
+        address = socket_path
+    else:
+        server = AnalysisServer((host, port), service, workers=workers)
+        address = "http://{}:{}".format(*server.server_address[:2])
+    click.echo(f"Serving tlparser on {address} with {workers} workers (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("Shutting down.")
+    finally:
+        server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
 @cli.command(name="visualize")
 @click.option(
     "--file", "-f", type=click.Path(exists=True), help="Path to the Excel file"
@@ -181,24 +841,39 @@ def evaluate_formula(formula_tokens, extended, verbose, requirement_text):
 @click.option(
     "--plot",
     "-p",
-    type=click.Choice(
-        [
-            "hist",
-            "viol",
-            "pair",
-            "chord",
-            "sankey",
-            "dag",
-            "all",
-        ],
-        case_sensitive=False,
-    ),
+    type=click.Choice(PLOT_TYPES, case_sensitive=False),
     multiple=True,
     help="Specify the plot types to generate",
 )
-def visualize_data(file, latest, selfonly, plot):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of plots rendered concurrently in separate processes.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    show_default=True,
+    help="Reuse plots whose input data and settings are unchanged.",
+)
+@click.option(
+    "--density",
+    type=click.Choice(["auto", "on", "off"], case_sensitive=False),
+    default="auto",
+    show_default=True,
+    help="Draw violin and pair plots from precomputed densities instead of "
+    "every value ('auto': only for large datasets).",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report per-stage timings on stderr and in a JSON file next to the output.",
+)
+def visualize_data(file, latest, selfonly, plot, jobs, cache, density, profile):
     """Creates a PDF plot from the Excel file"""
-
     if not (file or latest):
         click.echo("You must provide either --file or --latest.")
         return
@@ -206,40 +881,278 @@ def visualize_data(file, latest, selfonly, plot):
         latest = False
 
     working_dir = get_working_directory()
-    config = Configuration(
-        folder_data_out=working_dir,
-        logic_order=DEFAULT_ORDER,
-        color_palette=COLOR_PALETTE,
-    )
-    util = Utils(config)
+    util = Utils(Configuration(folder_data_out=working_dir))
+    if profile:
+        click.get_current_context().with_resource(
+            profiling_session("visualize", working_dir)
+        )
 
     # If --latest is used, find the latest file
     if latest:
-        file = util.get_latest_excel(config.folder_data_out)
+        file = util.get_latest_excel(working_dir)
         if len(file) == 0:
             click.echo("No Excel files found in the working directory.")
             return
         click.echo(f"Using latest file: {file}")
 
-    # Read the Excel file
-    viz = Viz(config, file, selfonly)
-    plot_methods = {
-        "hist": viz.plot_histogram,
-        "viol": viz.plot_violin_engcompl,
-        "viol_req": viz.plot_violin_reqtext,
-        "pair": viz.plot_pairplot,
-        "chord": viz.plot_chord,
-        "sankey": viz.plot_sankey,
-        "dag": viz.plot_dag_interactive,
-    }
+    render_visualizations(
+        file,
+        plot,
+        working_dir=working_dir,
+        selfonly=selfonly,
+        jobs=jobs,
+        cache=cache,
+        density=density,
+    )
+    click.echo("Plot generation completed.")
 
-    if "all" in plot or not plot:
-        plot = plot_methods.keys()
-    for pt in plot:
-        click.echo(f"Generating {pt} plot...")
-        plot_methods[pt]()
 
-    click.echo("Plot generation completed.")
+@cli.command(name="bench")
+@click.argument("datasets", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--scenario",
+    "-s",
+    type=click.Choice(
+        BENCH_SCENARIOS + ["digest", "viz", "all"], case_sensitive=False
+    ),
+    multiple=True,
+    help="Scenarios to run ('digest'/'viz' select all formats/plots; default: all).",
+)
+@click.option(
+    "--scale",
+    type=click.IntRange(min=2),
+    multiple=True,
+    help="Also run on a synthetic corpus of each dataset repeated this many times.",
+)
+@click.option(
+    "--repeat",
+    "-r",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Runs per scenario; throughput uses the median run.",
+)
+@click.option(
+    "--synthetic",
+    type=click.IntRange(min=1),
+    multiple=True,
+    help="Also run on a generated corpus of this many requirements (seed 0).",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write the JSON report to this file instead of stdout.",
+)
+@click.option(
+    "--isolate/--no-isolate",
+    default=True,
+    show_default=True,
+    help="Run each scenario in a fresh process so its peak RSS is its own.",
+)
+def run_bench(datasets, scenario, scale, repeat, synthetic, output, isolate):
+    """Benchmarks throughput, latency and memory on the bundled or given datasets"""
+    from tlparser import bench
+
+    if not datasets and not synthetic:
+        datasets = [
+            path
+            for path in (
+                os.path.join("data", "spacewire.json"),
+                os.path.join("data", "iot.json"),
+            )
+            if os.path.isfile(path)
+        ]
+        if not datasets:
+            raise click.UsageError(
+                "No datasets given and none found in ./data; use --synthetic N."
+            )
+
+    selected = scenario or ["all"]
+    scenarios = [
+        s
+        for s in BENCH_SCENARIOS
+        if any(name in ("all", s) or s.startswith(f"{name}-") for name in selected)
+    ]
+
+    corpora = {}
+    for path in datasets:
+        name = Utils.extract_filename_without_suffix(path)
+        corpora[name] = bench.load_dataset(path)
+        for factor in scale:
+            corpora[f"{name}x{factor}"] = bench.scaled_corpus(corpora[name], factor)
+    for count in synthetic:
+        from tlparser.generate import CorpusGenerator
+
+        corpora[f"synthetic{count}"] = CorpusGenerator(seed=0).corpus(count)
+
+    def echo_result(result):
+        if "skipped" in result:
+            summary = f"skipped ({result['skipped']})"
+        else:
+            summary = (
+                f"{result['formulas_per_sec']:.1f} formulas/s, "
+                f"p50 {result['p50_ms']:.3f} ms, p95 {result['p95_ms']:.3f} ms "
+                f"per {result['latency']}"
+            )
+        click.echo(f"{result['dataset']} {result['scenario']}: {summary}", err=True)
+
+    report = bench.run_benchmarks(
+        corpora, scenarios, repeat=repeat, isolate=isolate, on_result=echo_result
+    )
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+        click.echo(f"Saved benchmark report to {output}", err=True)
+    else:
+        click.echo(text)
+
+
+@cli.command(name="generate")
+@click.option(
+    "--count",
+    "-n",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Number of requirements to generate.",
+)
+@click.option("--seed", type=int, default=0, show_default=True, help="Random seed.")
+@click.option(
+    "--min-depth",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Smallest AST height of a generated formula.",
+)
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=0),
+    default=4,
+    show_default=True,
+    help="Largest AST height of a generated formula.",
+)
+@click.option(
+    "--width",
+    type=click.IntRange(min=2),
+    default=3,
+    show_default=True,
+    help="Largest number of operands of an and/or chain.",
+)
+@click.option(
+    "--vocabulary",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of distinct atomic propositions.",
+)
+@click.option(
+    "--comparisons",
+    type=click.FloatRange(0, 1),
+    default=None,
+    help="Share of propositions that are comparisons (default: per logic).",
+)
+@click.option(
+    "--mix",
+    multiple=True,
+    callback=parse_weights,
+    metavar="LOGIC:OP=WEIGHT",
+    help="Override an operator weight of a logic, e.g. 'LTL:U=3' or 'STL:not=0'.",
+)
+@click.option(
+    "--natural",
+    multiple=True,
+    callback=parse_weights,
+    metavar="LOGIC=WEIGHT",
+    help="Weight of a logic being the natural formalization (repeatable).",
+)
+@click.option(
+    "--translation",
+    multiple=True,
+    callback=parse_weights,
+    metavar="LABEL=WEIGHT",
+    help="Weight of a yes/no/depends translation label (repeatable).",
+)
+@click.option(
+    "--logic",
+    type=click.Choice(DEFAULT_ORDER),
+    multiple=True,
+    help="Logic types of each requirement (default: all).",
+)
+@click.option(
+    "--mutate",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Mutate the formulas of this digest JSON file instead of drawing new ones.",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("w"),
+    default="-",
+    help="Path to the generated JSON file (default: stdout).",
+)
+def generate_corpus(
+    count,
+    seed,
+    min_depth,
+    max_depth,
+    width,
+    vocabulary,
+    comparisons,
+    mix,
+    natural,
+    translation,
+    logic,
+    mutate,
+    output,
+):
+    """Generates a seeded synthetic corpus in the digest JSON format"""
+    from tlparser.generate import BINARY, LOGICS, NARY, UNARY, CorpusGenerator
+
+    operator_mix = {}
+    for key, weight in mix.items():
+        logic_name, _, op = key.partition(":")
+        if logic_name not in LOGICS or op not in UNARY | BINARY | NARY:
+            raise click.BadParameter(
+                f"Unknown logic or operator in '{key}'.", param_hint="--mix"
+            )
+        operator_mix.setdefault(logic_name, {})[op] = weight
+    for option, keys, known in (
+        ("--natural", natural, LOGICS),
+        ("--translation", translation, ["yes", "no", "depends"]),
+    ):
+        unknown = sorted(set(keys) - set(known))
+        if unknown:
+            raise click.BadParameter(
+                f"Unknown keys {', '.join(unknown)}; expected one of {', '.join(known)}.",
+                param_hint=option,
+            )
+
+    try:
+        generator = CorpusGenerator(
+            seed=seed,
+            min_depth=min_depth,
+            max_depth=max_depth,
+            width=width,
+            vocabulary=vocabulary,
+            comparisons=comparisons,
+            operator_mix=operator_mix,
+            natural_weights=natural or None,
+            translation_weights=translation or None,
+            logics=list(logic) or None,
+        )
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    if mutate:
+        with open(mutate, "r", encoding="utf-8") as fh:
+            corpus = generator.mutated_corpus(json.load(fh), count)
+    else:
+        corpus = generator.corpus(count)
+    json.dump(corpus, output, indent=2)
+    output.write("\n")
 
 
 @cli.command(name="cleanup")
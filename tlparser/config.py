@@ -1,6 +1,30 @@
 import json
 import pprint
 
+DEFAULT_STATI = ["OK"]
+DEFAULT_ORDER = ["INV", "LTL", "MTLb", "MITL", "TPTL", "CTLS", "STL"]
+DEFAULT_COLOR = [
+    "#687dd6",
+    "#56ac67",
+    "#ba543d",
+    "#20d8fd",
+    "#8750a6",
+    "#696969",
+    "#ac9c3d",
+]
+COLOR_PALETTE = dict(zip(DEFAULT_ORDER, DEFAULT_COLOR))
+
+# Scenarios of `tlparser bench`, kept here so the CLI need not import it
+BENCH_SCENARIOS = (
+    ["parse", "stats"]
+    + [f"digest-{fmt}" for fmt in ("xlsx", "json", "frame")]
+    + ["spot"]
+    + [
+        f"viz-{plot}"
+        for plot in ("hist", "viol", "viol_req", "pair", "chord", "sankey", "dag")
+    ]
+)
+
 
 class Configuration:
 
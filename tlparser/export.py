@@ -0,0 +1,101 @@
+"""Static export of plotly figures through one persistent kaleido instance.
+
+Starting kaleido (and its headless Chromium) is the most expensive part of
+writing a plotly figure. The export manager imports plotly and starts kaleido
+only once a figure is actually exported, keeps the instance until `close` and
+writes queued figures in batches.
+"""
+
+from __future__ import annotations
+
+import time
+from importlib import metadata
+
+from tlparser.profiling import stage
+
+
+def _kaleido_major() -> int:
+    try:
+        return int(metadata.version("kaleido").split(".")[0])
+    except (metadata.PackageNotFoundError, ValueError):
+        return 0
+
+
+class ExportManager:
+    """Queue plotly figures and write them with a shared kaleido instance."""
+
+    def __init__(self) -> None:
+        self._pending: list[tuple[object, str, str]] = []
+        self._started = False
+        self._batch_api = False
+        self.timings = {
+            "startup_seconds": 0.0,
+            "first_batch_seconds": None,  # Includes Chromium startup on kaleido 0.2
+            "exports": 0,
+            "export_seconds": 0.0,
+        }
+
+    def add(self, fig, path: str, image_format: str = "pdf") -> str:
+        """Queue `fig` for export to `path`; it is written by the next `flush`."""
+        self._pending.append((fig, path, image_format))
+        return path
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._start()
+        started = time.perf_counter()
+        import plotly.io as pio
+
+        with stage("viz.export"):
+            if self._batch_api:
+                for image_format in dict.fromkeys(fmt for _, _, fmt in batch):
+                    figures = [
+                        (fig, path) for fig, path, fmt in batch if fmt == image_format
+                    ]
+                    pio.write_images(
+                        [fig for fig, _ in figures],
+                        [path for _, path in figures],
+                        format=image_format,
+                    )
+            else:
+                for fig, path, image_format in batch:
+                    pio.write_image(fig, path, format=image_format)
+        seconds = time.perf_counter() - started
+        if self.timings["first_batch_seconds"] is None:
+            self.timings["first_batch_seconds"] = seconds
+        self.timings["exports"] += len(batch)
+        self.timings["export_seconds"] += seconds
+
+    def close(self) -> None:
+        """Write the queued figures and stop the kaleido server, if one was started."""
+        try:
+            self.flush()
+        finally:
+            if self._started and self._batch_api:
+                import kaleido
+
+                if hasattr(kaleido, "stop_sync_server"):
+                    kaleido.stop_sync_server(silence_warnings=True)
+            self._started = False
+
+    def _start(self) -> None:
+        if self._started:
+            return
+        started = time.perf_counter()
+        import plotly.io as pio
+
+        # kaleido >= 1 exports batches through a server that has to be started
+        # explicitly to persist; 0.2 keeps one scope alive per process itself
+        self._batch_api = _kaleido_major() >= 1 and hasattr(pio, "write_images")
+        if self._batch_api:
+            import kaleido
+
+            if hasattr(kaleido, "start_sync_server"):
+                kaleido.start_sync_server(silence_warnings=True)
+        else:
+            # Otherwise a "Loading [MathJax]" box ends up in PDF exports
+            pio.kaleido.scope.mathjax = None
+        self._started = True
+        self.timings["startup_seconds"] += time.perf_counter() - started
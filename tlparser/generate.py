@@ -0,0 +1,256 @@
+"""Seeded synthetic corpora in the digest JSON schema, for scaling tests.
+
+A corpus has one entry per requirement with one logic row per logic type.
+One row per requirement is the natural formalization (``"self"``); the others
+are labelled ``yes``/``no``/``depends`` following the translation weights,
+and only the natural and ``yes`` rows get a formula.
+
+Formulas are drawn bottom-up from per-logic operator weights, so their AST
+height is exactly the drawn depth. The parser has no interval or freeze
+syntax, so the timing constraints of MTLb, MITL, TPTL and STL show up, as in
+the bundled datasets, as comparisons (e.g. ``t <= 5``), which those logics
+get more of. Alternatively, real entries can serve as templates whose
+formulas are mutated (propositions renamed, operators and constants swapped
+for ones of the same arity), which keeps their shapes and label
+distributions.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+
+from tlparser.config import DEFAULT_ORDER
+
+LOGICS = list(DEFAULT_ORDER)
+UNARY = {"G", "F", "X", "A", "E", "not"}
+BINARY = {"U", "R", "-->"}
+NARY = {"and", "or"}
+COMPARISONS = ["==", "!=", "<", ">", "<=", ">="]
+
+_BOOLEAN = {"and": 3, "or": 1.5, "not": 1, "-->": 2}
+# Relative operator weights per logic; INV formulas are G over a boolean body
+OPERATOR_MIX: dict[str, dict[str, float]] = {
+    "INV": dict(_BOOLEAN),
+    "LTL": {**_BOOLEAN, "G": 3, "F": 2, "X": 1, "U": 1, "R": 0.3},
+    "MTLb": {**_BOOLEAN, "G": 3, "F": 2.5, "X": 0.5, "U": 1},
+    # No X: there is no next state in dense time
+    "MITL": {**_BOOLEAN, "G": 3, "F": 2.5, "U": 1.5, "R": 0.5},
+    "TPTL": {**_BOOLEAN, "G": 2.5, "F": 2, "X": 1, "U": 1},
+    "CTLS": {**_BOOLEAN, "A": 2, "E": 1.5, "G": 2, "F": 2, "X": 0.5, "U": 0.5},
+    "STL": {**_BOOLEAN, "G": 3, "F": 2, "U": 0.5},
+}
+# Probability that a leaf is a comparison instead of a plain proposition
+COMPARISON_DENSITY = {
+    "INV": 0.15,
+    "LTL": 0.15,
+    "MTLb": 0.3,
+    "MITL": 0.3,
+    "TPTL": 0.5,
+    "CTLS": 0.1,
+    "STL": 0.7,
+}
+# Roughly the labels of data/iot.json and data/spacewire.json
+NATURAL_WEIGHTS = {"LTL": 0.9, "INV": 0.05, "MTLb": 0.03, "STL": 0.02}
+TRANSLATION_WEIGHTS = {"yes": 0.1, "no": 0.82, "depends": 0.08}
+
+# Constants glued to a unit (``1KB``) are single tokens that stay as they are
+_TOKEN = re.compile(r"\s+|-->|[<>!=]=|[<>]|[A-Za-z_]\w*|\d+(?![A-Za-z_])|\w+|.")
+# Operators that can replace each other without changing the arity
+_SWAPS = [("G", "F", "X"), ("A", "E"), ("U", "R")]
+_KEYWORDS = UNARY | BINARY | NARY | {"true", "false"}
+_WORDS = {
+    "G": "always",
+    "F": "eventually",
+    "X": "next",
+    "U": "until",
+    "R": "releases",
+    "A": "on all paths",
+    "E": "on some path",
+    "-->": "implies",
+}
+
+
+class CorpusGenerator:
+    """Draw requirements, formulas and mutations from one seeded random stream."""
+
+    def __init__(
+        self,
+        *,
+        seed: int = 0,
+        min_depth: int = 1,
+        max_depth: int = 4,
+        width: int = 3,
+        vocabulary: int = 20,
+        max_constant: int = 100,
+        comparisons: float | None = None,
+        operator_mix: dict[str, dict[str, float]] | None = None,
+        natural_weights: dict[str, float] | None = None,
+        translation_weights: dict[str, float] | None = None,
+        logics: list[str] | None = None,
+    ) -> None:
+        if not 0 <= min_depth <= max_depth:
+            raise ValueError("Depths must satisfy 0 <= min_depth <= max_depth")
+        if width < 2:
+            raise ValueError("The width of and/or chains must be at least 2")
+        if vocabulary < 1:
+            raise ValueError("The vocabulary needs at least one proposition")
+        self.rng = random.Random(seed)
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.width = width
+        self.names = [f"p{i}" for i in range(vocabulary)]
+        self.max_constant = max_constant
+        self.logics = list(logics) if logics else list(LOGICS)
+        self.operator_mix = {
+            logic: {**OPERATOR_MIX[logic], **(operator_mix or {}).get(logic, {})}
+            for logic in self.logics
+        }
+        self.comparison_density = {
+            logic: COMPARISON_DENSITY[logic] if comparisons is None else comparisons
+            for logic in self.logics
+        }
+        natural = natural_weights or NATURAL_WEIGHTS
+        self.natural_weights = {
+            logic: weight for logic, weight in natural.items() if logic in self.logics
+        }
+        if not any(self.natural_weights.values()):
+            # None of the usual natural logics was selected
+            self.natural_weights = dict.fromkeys(self.logics, 1.0)
+        self.translation_weights = translation_weights or TRANSLATION_WEIGHTS
+
+    def _choice(self, weights: dict[str, float]) -> str:
+        keys = [key for key, weight in weights.items() if weight > 0]
+        return self.rng.choices(keys, [weights[key] for key in keys])[0]
+
+    def leaf(self, logic: str) -> str:
+        name = self.rng.choice(self.names)
+        if self.rng.random() >= self.comparison_density[logic]:
+            return name
+        if self.rng.random() < 0.25:
+            other = self.rng.choice(self.names)
+        else:
+            other = str(self.rng.randint(0, self.max_constant))
+        return f"{name} {self.rng.choice(COMPARISONS)} {other}"
+
+    def node(self, logic: str, depth: int) -> str:
+        """A formula of logic whose AST height is exactly depth"""
+        if depth == 0:
+            return self.leaf(logic)
+        op = self._choice(self.operator_mix[logic])
+        if op in UNARY:
+            return f"{op} ({self.node(logic, depth - 1)})"
+        if op in BINARY:
+            arity = 2
+        else:
+            arity = self.rng.randint(2, self.width)
+        # One operand carries the full depth, the others may be shallower
+        depths = [self.rng.randint(0, depth - 1) for _ in range(arity)]
+        depths[self.rng.randrange(arity)] = depth - 1
+        return f" {op} ".join(f"({self.node(logic, d)})" for d in depths)
+
+    def formula(self, logic: str, depth: int | None = None) -> str:
+        if depth is None:
+            depth = self.rng.randint(self.min_depth, self.max_depth)
+        if logic == "INV":
+            # An invariant is a state formula that holds globally
+            return f"G ({self.node(logic, max(depth - 1, 0))})"
+        return self.node(logic, depth)
+
+    def text(self, entry_id: int, formula: str) -> str:
+        words = [
+            _WORDS.get(token, token)
+            for token in _TOKEN.findall(formula)
+            if not token.isspace() and token not in "()"
+        ]
+        return f"Requirement {entry_id}: " + " ".join(words) + "."
+
+    def entry(self, entry_id: int) -> dict:
+        natural = self._choice(self.natural_weights)
+        logics = []
+        for logic in self.logics:
+            translation = (
+                "self" if logic == natural else self._choice(self.translation_weights)
+            )
+            formula = self.formula(logic) if translation in ("self", "yes") else ""
+            logics.append(
+                {
+                    "type": logic,
+                    "f_latex": "",
+                    "f_code": formula,
+                    "translation": translation,
+                    "reasoning": "",
+                }
+            )
+        natural_formula = next(l["f_code"] for l in logics if l["type"] == natural)
+        return {
+            "id": entry_id,
+            "status": "OK",
+            "text": self.text(entry_id, natural_formula),
+            "logics": logics,
+        }
+
+    def corpus(self, count: int, start_id: int = 1) -> list[dict]:
+        return [self.entry(entry_id) for entry_id in range(start_id, start_id + count)]
+
+    def mutate(self, formula: str, logic: str = "LTL") -> str:
+        """Rename propositions into the vocabulary and swap operators and constants.
+
+        Every replacement has the arity of the original token, so the result
+        parses whenever the original did and has the same AST height. The
+        parser rejects unparenthesised mixes of ``and`` and ``or``, so these
+        are only ever flipped all at once.
+        """
+        allowed = self.operator_mix.get(logic, OPERATOR_MIX["LTL"])
+        names: dict[str, str] = {}
+        flip = self.rng.random() < 0.5
+        parts = []
+        for token in _TOKEN.findall(formula):
+            group = next((group for group in _SWAPS if token in group), None)
+            if group is not None:
+                parts.append(self._swap(token, group, allowed))
+            elif token in NARY:
+                parts.append({"and": "or", "or": "and"}[token] if flip else token)
+            elif token in COMPARISONS:
+                parts.append(self.rng.choice(COMPARISONS))
+            elif token.isdigit():
+                parts.append(str(self.rng.randint(0, self.max_constant)))
+            elif token[0].isalpha() or token[0] == "_":
+                if token in _KEYWORDS:
+                    parts.append(token)
+                else:
+                    parts.append(names.setdefault(token, self.rng.choice(self.names)))
+            else:
+                parts.append(token)
+        return "".join(parts)
+
+    def _swap(self, token: str, group: tuple[str, ...], allowed: dict[str, float]):
+        """Replace token by an operator of its group, weighted by the logic's mix"""
+        weights = {op: allowed.get(op, 0) for op in group}
+        if self.rng.random() < 0.5 or not any(weights.values()):
+            return token
+        return self._choice(weights)
+
+    def mutated_corpus(
+        self, templates: list[dict], count: int, start_id: int = 1
+    ) -> list[dict]:
+        """count entries modelled on randomly drawn template entries"""
+        entries = []
+        for entry_id in range(start_id, start_id + count):
+            template = self.rng.choice(templates)
+            entries.append(
+                {
+                    **template,
+                    "id": entry_id,
+                    "logics": [
+                        {
+                            **logic,
+                            "f_code": self.mutate(logic["f_code"], logic["type"])
+                            if logic["f_code"].strip()
+                            else logic["f_code"],
+                        }
+                        for logic in template["logics"]
+                    ],
+                }
+            )
+        return entries
@@ -0,0 +1,149 @@
+"""Append-only checkpoint journal for long-running digests.
+
+Every analyzed row is appended as one JSON line next to the digest output, so
+an interrupted run (Ctrl-C, OOM, reboot) can be resumed with ``--resume``
+without repeating finished work. The journal is removed once the output file
+has been written.
+
+The first line of a journal records the settings of its run (e.g. extended
+analysis or the shard), and a resume with different settings is refused so
+incompatible rows are never mixed into one output.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from tlparser.utils import Utils
+
+
+class Journal:
+    """Checkpoint journal keyed by the ``(id, type)`` pair of a digest row."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        settings: dict | None = None,
+        sync_every: int = 25,
+        sync_seconds: float = 30.0,
+    ) -> None:
+        self.path = path
+        # Normalized through JSON so they compare equal to the stored ones
+        self.settings = json.loads(json.dumps(settings or {}))
+        self.sync_every = sync_every
+        self.sync_seconds = sync_seconds
+        self.completed: dict[tuple[Any, Any], dict] = {}
+        self.stored_settings: dict | None = None
+        self.created = False
+        self._fh = None
+        # Rows of an interrupted worker thread may arrive while closing
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def path_for(folder: str, prefix: str, source: str | None = None) -> str:
+        """Journal path for prefix, made unique to the input file source"""
+        if source is not None:
+            prefix = f"{prefix}_{Utils.path_digest(source)}"
+        return os.path.join(folder, f"{prefix}_journal.jsonl")
+
+    @staticmethod
+    def key(item: dict) -> tuple[Any, Any]:
+        return item["id"], item["type"]
+
+    def load(self) -> int:
+        """Read completed rows from an existing journal; returns their count."""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line of an interrupted run
+                if "settings" in record:
+                    self.stored_settings = record["settings"]
+                    continue
+                self.completed[self.key(record["item"])] = record
+        return len(self.completed)
+
+    def open(self, *, resume: bool = False) -> "Journal":
+        if resume:
+            self.load()
+            if (
+                self.stored_settings is not None or self.completed
+            ) and self.stored_settings != self.settings:
+                raise ValueError(
+                    f"Journal {self.path} was written with the settings "
+                    f"{self.stored_settings}, not {self.settings}; resume with "
+                    "the options of the interrupted digest or delete the file."
+                )
+        elif os.path.exists(self.path):
+            raise FileExistsError(
+                f"Journal {self.path} of an interrupted digest exists; "
+                "pass --resume to continue it or delete the file."
+            )
+        self.created = not os.path.exists(self.path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        torn = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as fh:
+                fh.seek(-1, os.SEEK_END)
+                torn = fh.read(1) != b"\n"
+        self._fh = open(self.path, "a", encoding="utf-8")
+        if torn:
+            self._fh.write("\n")  # Terminate the torn last line of a crashed run
+        if self.stored_settings is None:
+            self._fh.write(json.dumps({"settings": self.settings}) + "\n")
+            self._fh.flush()
+        return self
+
+    def append(self, item: dict, issues: list[str] | None = None) -> None:
+        record = {"item": Utils.serialize_item(item)}
+        if issues:
+            record["issues"] = issues
+        with self._lock:
+            if self._fh is None:
+                return  # Closed after an interrupt; the row is redone on resume
+            self._fh.write(json.dumps(record) + "\n")
+            self._fh.flush()
+            self._pending += 1
+            if (
+                self._pending >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_seconds
+            ):
+                self._sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._fh is not None and self._pending:
+            os.fsync(self._fh.fileno())
+            self._pending = 0
+            self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._sync()
+                self._fh.close()
+                self._fh = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
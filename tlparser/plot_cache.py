@@ -0,0 +1,90 @@
+"""Content-addressed cache of rendered ``visualize`` figures.
+
+A figure only depends on a handful of digest columns, the plot type, the
+``selfonly`` filter, the rendering mode and the configured logic order and
+palette. The cache hashes exactly these inputs and remembers which files were
+rendered for them in a JSON manifest next to the plots, so repeated
+``visualize`` runs on an unchanged digest reuse the existing files instead of
+rendering them again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from importlib import metadata
+
+import pandas as pd
+
+MANIFEST_NAME = "plot_cache.json"
+
+
+def _package_version() -> str:
+    try:
+        return metadata.version("tlparser")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def output_paths(output) -> list[str]:
+    """Paths of a plot method's return value (a path, newline-joined paths or a list)"""
+    if not output:
+        return []
+    if isinstance(output, str):
+        return output.split("\n")
+    return list(output)
+
+
+class PlotCache:
+    """Manifest mapping input hashes to the files rendered for them."""
+
+    def __init__(self, folder: str) -> None:
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.entries: dict[str, dict] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as fh:
+                    self.entries = json.load(fh)
+            except (OSError, json.JSONDecodeError):
+                self.entries = {}  # A damaged manifest only costs a re-render
+
+    @staticmethod
+    def key(
+        plot: str,
+        data: pd.DataFrame,
+        *,
+        selfonly: bool,
+        config,
+        density: bool | None = None,
+    ) -> str:
+        digest = hashlib.sha256()
+        settings = {
+            "plot": plot,
+            "selfonly": bool(selfonly),
+            "density": density,
+            "logic_order": list(config.logic_order),
+            "color_palette": config.color_palette,
+            "columns": list(data.columns),
+            "version": _package_version(),
+        }
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def lookup(self, key: str):
+        """Return the cached output if every file of it still exists, else None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if not all(os.path.exists(path) for path in output_paths(entry["output"])):
+            return None
+        return entry["output"]
+
+    def store(self, key: str, plot: str, output) -> None:
+        self.entries[key] = {"plot": plot, "output": output}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.entries, fh, indent=2)
+        os.replace(tmp, self.path)
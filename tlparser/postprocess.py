@@ -0,0 +1,97 @@
+"""Post-processing stage shared by all digest writers.
+
+The stage operates on flattened digest rows (plain dicts as produced by
+``Utils.flatten_dict``) and never materialises a full DataFrame, so it can be
+used by the Excel writer as well as by line-oriented or streaming writers.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def translation_classes(
+    ids: Sequence, types: Sequence, translations: Sequence, logic_order: Sequence[str]
+) -> np.ndarray:
+    """Return the translation class of every row.
+
+    The class of a requirement is the concatenation of the first letters of
+    its translations, ordered by ``logic_order``. Types missing from
+    ``logic_order`` sort last; ties keep their input order.
+    """
+    if len(ids) == 0:
+        return np.empty(0, dtype=object)
+
+    id_codes, _ = pd.factorize(np.asarray(ids, dtype=object))
+    type_codes = pd.Index(list(logic_order)).get_indexer(
+        np.asarray(types, dtype=object)
+    ).astype(np.int64)
+    type_codes[type_codes < 0] = len(logic_order)
+    initials = np.array([t[:1] if t else "" for t in translations], dtype=object)
+
+    # Sort by (id, type); np.lexsort is stable so ties keep their input order
+    order = np.lexsort((type_codes, id_codes))
+    sorted_ids = id_codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+
+    # Factorized codes are dense, so group i of the sorted frame is id code i
+    classes = np.add.reduceat(initials[order], starts)
+    return classes[id_codes]
+
+
+def group_codes(rows: Sequence[dict], group_by: Sequence[str]) -> np.ndarray:
+    """Return dense integer codes identifying the ``group_by`` key of every row."""
+    codes = np.zeros(len(rows), dtype=np.int64)
+    for column in group_by:
+        column_codes, uniques = pd.factorize(
+            np.asarray([row.get(column) for row in rows], dtype=object)
+        )
+        codes = codes * (len(uniques) + 1) + column_codes + 1
+    return pd.factorize(codes)[0]
+
+
+def add_translation_class(
+    rows: list[dict], logic_order: Sequence[str], group_by: Sequence[str] = ("id",)
+) -> list[dict]:
+    """Set ``translationclass`` on every flattened row in place and return them.
+
+    Rows are grouped by the ``group_by`` columns, which defaults to the
+    requirement id; merged multi-file digests group by ``("source", "id")``.
+    """
+    classes = translation_classes(
+        group_codes(rows, group_by),
+        [row.get("type") for row in rows],
+        [row.get("translation") for row in rows],
+        logic_order,
+    )
+    for row, translation_class in zip(rows, classes):
+        row["translationclass"] = translation_class
+    return rows
+
+
+def iter_translation_class(
+    rows: Iterable[dict],
+    logic_order: Sequence[str],
+    group_by: Sequence[str] = ("id",),
+    *,
+    batch_size: int = 1000,
+) -> Iterator[dict]:
+    """Streaming variant of :func:`add_translation_class`.
+
+    Rows of one requirement must arrive consecutively (as they do when reading
+    a digest JSON file). Rows are buffered into batches of at least
+    ``batch_size`` rows that are only cut at requirement boundaries.
+    """
+    batch: list[dict] = []
+    for row in rows:
+        if len(batch) >= batch_size and any(
+            row.get(column) != batch[-1].get(column) for column in group_by
+        ):
+            yield from add_translation_class(batch, logic_order, group_by)
+            batch = []
+        batch.append(row)
+    if batch:
+        yield from add_translation_class(batch, logic_order, group_by)
@@ -0,0 +1,137 @@
+"""Opt-in per-stage timings behind ``--profile``.
+
+Instrumented code wraps each stage in ``with stage("stats.parse"):``. Unless
+a profiler is enabled, ``stage`` returns a shared no-op context manager, so
+the hooks cost next to nothing in normal runs. Stages are named
+``<component>.<stage>``; the summary lists them in the order they first ran.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import nullcontext
+
+_NULL = nullcontext()
+_profiler: Profiler | None = None
+
+
+def percentile(values, q: float) -> float | None:
+    """The q-th percentile (0-100) of values, linearly interpolated"""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class Profiler:
+    """Collect the durations of named stages, from any thread."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def merge(self, samples: dict[str, list[float]]) -> None:
+        """Add the samples of another profiler (e.g. from a worker process)"""
+        with self._lock:
+            for name, durations in samples.items():
+                self.samples.setdefault(name, []).extend(durations)
+
+    def drain(self) -> dict[str, list[float]]:
+        """Return and forget the samples collected so far"""
+        with self._lock:
+            samples, self.samples = self.samples, {}
+        return samples
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            samples = {name: list(durations) for name, durations in self.samples.items()}
+        return {
+            name: {
+                "count": len(durations),
+                "total_s": round(sum(durations), 6),
+                "mean_ms": round(sum(durations) / len(durations) * 1000, 4),
+                "p50_ms": round(percentile(durations, 50) * 1000, 4),
+                "p95_ms": round(percentile(durations, 95) * 1000, 4),
+                "max_ms": round(max(durations) * 1000, 4),
+            }
+            for name, durations in samples.items()
+        }
+
+    def format(self) -> str:
+        """The summary as a plain-text table"""
+        header = ("stage", "count", "total s", "mean ms", "p50 ms", "p95 ms", "max ms")
+        rows = [
+            (
+                name,
+                str(s["count"]),
+                f"{s['total_s']:.4f}",
+                f"{s['mean_ms']:.3f}",
+                f"{s['p50_ms']:.3f}",
+                f"{s['p95_ms']:.3f}",
+                f"{s['max_ms']:.3f}",
+            )
+            for name, s in self.summary().items()
+        ]
+        widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+            for row in [header, *rows]
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"stages": self.summary()}, fh, indent=2)
+            fh.write("\n")
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler: Profiler, name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.add(self.name, time.perf_counter() - self.started)
+
+
+def stage(name: str):
+    """Context manager timing one run of the stage `name` while profiling"""
+    profiler = _profiler
+    if profiler is None:
+        return _NULL
+    return _Stage(profiler, name)
+
+
+def active() -> Profiler | None:
+    return _profiler
+
+
+def enable() -> Profiler:
+    """Start collecting stage timings in this process"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def disable() -> Profiler | None:
+    """Stop collecting and return the profiler with everything it collected"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler
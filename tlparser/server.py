@@ -0,0 +1,316 @@
+"""Long-running HTTP/JSON analysis service (``tlparser serve``).
+
+Editor integrations that analyze formulas on every keystroke pause cannot
+afford a process start and a fresh Spot discovery per call. The service keeps
+the CTLS parser, the Spot tool registry and the result caches warm and answers
+requests from a bounded pool of worker threads, either on a TCP port or on a
+Unix socket.
+
+Endpoints:
+
+* ``POST /evaluate`` with ``{"formula": ..., "text": ..., "extended": ...}``
+* ``POST /digest`` with ``{"entries": [...], "extended": ..., "statuses": [...]}``
+  where ``entries`` follows the digest JSON file format
+* ``GET /health`` and ``GET /metrics``
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Sequence
+
+from tlparser.config import Configuration
+from tlparser.stats import get_parser
+from tlparser.stats_ext import SpotAnalyzer
+from tlparser.utils import Utils
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class RequestError(Exception):
+    """A request that cannot be served; carries the HTTP status to answer with."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisService:
+    """Warm analysis state shared by all requests of a server."""
+
+    def __init__(
+        self,
+        *,
+        logic_order: Sequence[str],
+        only_with_status: Sequence[str] = ("OK",),
+        extended: bool = False,
+        verbose: bool = False,
+        cache_size: int = 4096,
+    ) -> None:
+        self.logic_order = list(logic_order)
+        self.only_with_status = list(only_with_status)
+        self.extended = extended
+        self.verbose = verbose
+        self.cache_size = cache_size
+        self.spot_analyzer = SpotAnalyzer(verbose=verbose)
+        self.started = time.time()
+        self._cache: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: dict[str, Any] = {
+            "requests": {},
+            "errors": 0,
+            "formulas": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "in_flight": 0,
+            "seconds": {},
+        }
+
+    def warm_up(self) -> None:
+        """Build the parser tables (and discover Spot) before the first request."""
+        get_parser()
+        if self.extended:
+            self.spot_analyzer.warm_up()
+
+    def _extended(self, payload: dict) -> bool:
+        extended = payload.get("extended", self.extended)
+        if not isinstance(extended, bool):
+            raise RequestError(HTTPStatus.BAD_REQUEST, '"extended" must be a boolean.')
+        return extended
+
+    def evaluate(self, payload: dict) -> dict:
+        formula = payload.get("formula")
+        if not isinstance(formula, str) or not formula.strip():
+            raise RequestError(HTTPStatus.BAD_REQUEST, '"formula" must be a string.')
+        text = payload.get("text")
+        extended = self._extended(payload)
+        key = (formula, text, extended)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._counters["cache_hits"] += 1
+                return cached
+            self._counters["cache_misses"] += 1
+
+        util = Utils(Configuration(logic_order=self.logic_order))
+        try:
+            stats = util.analyze_single_formula(
+                formula.strip(),
+                extended=extended,
+                requirement_text=text,
+                verbose=self.verbose,
+                spot_analyzer=self.spot_analyzer,
+            )
+        except Exception as exc:  # noqa: BLE001 - reported to the client
+            raise RequestError(
+                HTTPStatus.UNPROCESSABLE_ENTITY, f"{type(exc).__name__}: {exc}"
+            ) from exc
+        issues = [problem for _, problems in util.spot_issues for problem in problems]
+        response = {"result": stats.as_serializable(), "issues": issues}
+
+        with self._lock:
+            self._counters["formulas"] += 1
+            self._cache[key] = response
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    def digest(self, payload: dict) -> dict:
+        entries = payload.get("entries")
+        if not isinstance(entries, list) or not all(
+            isinstance(entry, dict) for entry in entries
+        ):
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, '"entries" must be a list of requirements.'
+            )
+        statuses = payload.get("statuses", self.only_with_status)
+        if not isinstance(statuses, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, '"statuses" must be a list.')
+        util = Utils(
+            Configuration(only_with_status=statuses, logic_order=self.logic_order)
+        )
+        try:
+            items = util.read_formulas_from_json(
+                extended=self._extended(payload),
+                verbose=self.verbose,
+                spot_analyzer=self.spot_analyzer,
+                entries=entries,
+            )
+        except (KeyError, TypeError) as exc:
+            message = f"Malformed entries: {type(exc).__name__}: {exc}"
+            raise RequestError(HTTPStatus.BAD_REQUEST, message) from exc
+        with self._lock:
+            self._counters["formulas"] += len(items)
+        return {
+            "results": [Utils.serialize_item(item) for item in items],
+            "failed": len(util.failures),
+            "issues": [
+                {"formula": formula, "issues": problems}
+                for formula, problems in util.spot_issues
+            ],
+        }
+
+    def health(self) -> dict:
+        return {"status": "ok", "uptime": round(time.time() - self.started, 3)}
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counters = copy.deepcopy(self._counters)
+            cached = len(self._cache)
+        counters["seconds"] = {
+            path: round(seconds, 6) for path, seconds in counters["seconds"].items()
+        }
+        return {
+            **counters,
+            "uptime": round(time.time() - self.started, 3),
+            "cached_responses": cached,
+            "cached_spot_results": self.spot_analyzer.cached_results,
+        }
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._counters["in_flight"] += 1
+
+    def request_finished(self, path: str, seconds: float, *, error: bool) -> None:
+        with self._lock:
+            self._counters["in_flight"] -= 1
+            requests = self._counters["requests"]
+            requests[path] = requests.get(path, 0) + 1
+            total = self._counters["seconds"]
+            total[path] = total.get(path, 0.0) + seconds
+            self._counters["errors"] += error
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    server_version = "tlparser"
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections must not occupy pool workers for long
+    timeout = 10
+
+    routes = {
+        ("GET", "/health"): "health",
+        ("GET", "/metrics"): "metrics",
+        ("POST", "/evaluate"): "evaluate",
+        ("POST", "/digest"): "digest",
+    }
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        service: AnalysisService = self.server.service
+        path = self.path.split("?", 1)[0]
+        known = path in {route for _, route in self.routes}
+        started = time.perf_counter()
+        service.request_started()
+        status = HTTPStatus.OK
+        try:
+            name = self.routes.get((method, path))
+            if name is None:
+                raise RequestError(
+                    HTTPStatus.METHOD_NOT_ALLOWED if known else HTTPStatus.NOT_FOUND,
+                    f"No route for {method} {path}.",
+                )
+            handler = getattr(service, name)
+            body = handler(self._read_json()) if method == "POST" else handler()
+        except RequestError as exc:
+            status = exc.status
+            body = {"error": str(exc)}
+        except Exception as exc:  # noqa: BLE001 - keep the service alive
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            body = {"error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            service.request_finished(
+                path if known else "other",
+                time.perf_counter() - started,
+                error=status >= HTTPStatus.BAD_REQUEST,
+            )
+        if status >= HTTPStatus.BAD_REQUEST:
+            # The request body may be unread, so the connection cannot be reused
+            self.close_connection = True
+        self._send_json(status, body)
+
+    def _read_json(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            raise RequestError(
+                HTTPStatus.LENGTH_REQUIRED, "Content-Length is required."
+            )
+        if length > MAX_BODY_BYTES:
+            raise RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large."
+            )
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {exc}")
+        if not isinstance(payload, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Expected a JSON object.")
+        return payload
+
+    def _send_json(self, status: HTTPStatus, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.service.verbose:
+            super().log_message(format, *args)
+
+
+class _PooledServerMixIn:
+    """Serve each connection on a bounded thread pool instead of a new thread."""
+
+    # Bursts of editor requests must not overflow the default backlog of 5
+    request_queue_size = 128
+
+    def __init__(self, address, service: AnalysisService, *, workers: int) -> None:
+        self.service = service
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="tlparser-serve"
+        )
+        super().__init__(address, AnalysisRequestHandler)
+
+    def process_request(self, request, client_address) -> None:
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # noqa: BLE001 - same as socketserver.ThreadingMixIn
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class AnalysisServer(_PooledServerMixIn, HTTPServer):
+    """HTTP analysis server on a TCP port."""
+
+
+class UnixAnalysisServer(_PooledServerMixIn, socketserver.UnixStreamServer):
+    """HTTP analysis server on a Unix domain socket."""
@@ -8,6 +8,8 @@ import json
 import shutil
 import os
 
+from tlparser.profiling import stage
+
 SHOW_INVOCATIONS = False  # Set to True to print each command invoked to stderr
 
 REQUIRED_SPOT_TOOLS = ("ltl2tgba", "ltlfilt", "autfilt")
@@ -101,15 +103,16 @@ def invoke(command, input_data=None):
         else:
             print(f"\nInvoking command: {cmd_str}", file=sys.stderr)
     try:
-        process = subprocess.Popen(
-            command,
-            stdin=subprocess.PIPE if input_data else None,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-        )
-        stdout, stderr = process.communicate(input=input_data)
+        with stage(f"spot.{os.path.basename(command[0])}"):
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE if input_data else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+            )
+            stdout, stderr = process.communicate(input=input_data)
     except FileNotFoundError as e:
         # Nicer message for missing Spot tools
         missing = command[0]
@@ -137,32 +140,26 @@ def invoke(command, input_data=None):
     return stdout.strip()
 
 
-def get_automaton_and_stats(ltl_formula, to_buchi=False, to_deterministic=False):
-    """
-    Translates LTL and attempts to get basic automaton statistics directly from ltl2tgba
-    Returns: (hoa_automaton_string, stats_dict)
-    """
-    require_spot(("ltl2tgba",))
-    cmd_base = ["ltl2tgba", "-f", ltl_formula]
-    cmd_stats = ["ltl2tgba", "-f", ltl_formula]
-
+def _translation_command(ltl_formula, to_buchi=False, to_deterministic=False):
+    command = ["ltl2tgba", "-f", ltl_formula]
     if to_buchi:
-        cmd_base.append("-B")
-        cmd_stats.append("-B")
+        command.append("-B")
     if to_deterministic:
-        cmd_base.append("-D")
-        cmd_stats.append("-D")
+        command.append("-D")
+    return command
 
-    hoa_automaton = ""
-    try:
-        hoa_automaton = invoke(cmd_base)
-    except subprocess.CalledProcessError as e:
-        _debug(f"Error generating automaton: {e}")
-        return "", {"error": str(e)}
 
+def get_automaton_stats(ltl_formula, to_buchi=False, to_deterministic=False):
+    """
+    Translates LTL and returns basic automaton statistics from ltl2tgba --stats
+    without materialising the automaton itself.
+    Returns: stats_dict (with an "error" key if the statistics are unavailable)
+    """
+    require_spot(("ltl2tgba",))
+    command = _translation_command(ltl_formula, to_buchi, to_deterministic)
     stats_dict = {}
     try:
-        stats_output = invoke(cmd_stats + ["--stats=%s %t %p %d %a"])
+        stats_output = invoke(command + ["--stats=%s %t %p %d %a"])
         parts = stats_output.split()
         if len(parts) == 5:
             stats_dict["state_count"] = int(parts[0])
@@ -175,8 +172,19 @@ def get_automaton_and_stats(ltl_formula, to_buchi=False, to_deterministic=False)
             stats_dict["error"] = "Unexpected stats output format from ltl2tgba."
     except (subprocess.CalledProcessError, ValueError) as e:
         stats_dict["error"] = f"Failed to get direct stats from ltl2tgba: {e}"
+    return stats_dict
 
-    return hoa_automaton, stats_dict
+
+def get_automaton(ltl_formula, to_buchi=False, to_deterministic=False):
+    """
+    Translates LTL into a HOA automaton string ("" if the translation fails)
+    """
+    require_spot(("ltl2tgba",))
+    try:
+        return invoke(_translation_command(ltl_formula, to_buchi, to_deterministic))
+    except subprocess.CalledProcessError as e:
+        _debug(f"Error generating automaton: {e}")
+        return ""
 
 
 def analyze_automaton_fallback(hoa_automaton):
@@ -300,12 +308,80 @@ def get_manna_pnueli_class(ltl_formula):
         return "Error"
 
 
+class AnalysisPlan:
+    """
+    Derives properties implied by earlier results so that classify_ltl_property
+    only runs the residual Spot invocations:
+
+    - Stutter invariance is a property of the language, and all automata built
+      for a formula accept its language, so the formula-level answer of
+      `ltlfilt --stutter-invariant` is reused for every automaton. autfilt is
+      only consulted (once, on the TGBA) if that check failed.
+    - Automaton statistics come from `ltl2tgba --stats`; the HOA automaton is
+      only built when an autfilt fallback needs it.
+
+    The deterministic attempt always runs its own `ltl2tgba -D --stats`: `-D`
+    changes the translator's preferences, so even when the default TGBA is
+    deterministic its counts need not match the `-D` output.
+    """
+
+    def __init__(self, ltl_formula):
+        self.ltl_formula = ltl_formula
+        self._automata = {}
+        self._automaton_stutter = None
+
+    def automaton(self, to_buchi=False, to_deterministic=False):
+        key = (to_buchi, to_deterministic)
+        if key not in self._automata:
+            self._automata[key] = get_automaton(self.ltl_formula, *key)
+        return self._automata[key]
+
+    def stutter_invariance(self, formula_result):
+        """Return the automaton-level stutter invariance for all automata."""
+        if formula_result != "Error":
+            return formula_result
+        if self._automaton_stutter is None:
+            hoa_tgba = self.automaton()
+            if not hoa_tgba.strip():
+                self._automaton_stutter = "Error"
+            else:
+                self._automaton_stutter = _check_automaton_property(
+                    hoa_tgba, "--is-stutter-invariant"
+                )
+        return self._automaton_stutter
+
+    def analyze(self, stutter_invariant, to_buchi=False):
+        """Return the analysis dict for the TGBA or the Buchi automaton."""
+        stats = get_automaton_stats(self.ltl_formula, to_buchi=to_buchi)
+        if "error" in stats:
+            kind = "Buchi" if to_buchi else "TGBA"
+            _debug(f"Falling back to autfilt for {kind} analysis: {stats['error']}")
+            return analyze_automaton_fallback(self.automaton(to_buchi=to_buchi))
+        stats["is_stutter_invariant"] = self.stutter_invariance(stutter_invariant)
+        return stats
+
+    def deterministic_attempt(self, stutter_invariant):
+        stats = get_automaton_stats(self.ltl_formula, to_deterministic=True)
+        if "error" in stats:
+            return {"success": False, "automaton_analysis": {}, "error": stats["error"]}
+        stats["is_stutter_invariant"] = self.stutter_invariance(stutter_invariant)
+        return {"success": True, "automaton_analysis": stats}
+
+
+def _check_automaton_property(hoa_automaton, prop_flag):
+    try:
+        return bool(invoke(["autfilt", prop_flag], input_data=hoa_automaton))
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return "Error"
+
+
 def classify_ltl_property(ltl_formula, *, verbose: bool | None = None):
     prev_verbose = get_verbose()
     if verbose is not None:
         set_verbose(verbose)
 
     try:
+        plan = AnalysisPlan(ltl_formula)
         classification = {
             "formula": ltl_formula,
             "syntactic_safety": None,
@@ -321,66 +397,26 @@ def classify_ltl_property(ltl_formula, *, verbose: bool | None = None):
             ltl_formula, "syntactic_safety"
         )
 
-        # Check stutter invariance
-        classification["is_stutter_invariant_formula"] = check_ltl_property_type(
-            ltl_formula, "stutter_invariant"
-        )
+        # Check stutter invariance (shared by all automata below)
+        stutter_invariant = check_ltl_property_type(ltl_formula, "stutter_invariant")
+        classification["is_stutter_invariant_formula"] = stutter_invariant
 
         # Get Manna-Pnueli Class
         classification["manna_pnueli_class"] = get_manna_pnueli_class(ltl_formula)
 
         # Translate to default TGBA and analyze
-        hoa_tgba, tgba_stats = get_automaton_and_stats(
-            ltl_formula, to_buchi=False, to_deterministic=False
-        )
-        if "error" in tgba_stats:
-            _debug(f"Falling back to autfilt for TGBA analysis: {tgba_stats['error']}")
-            classification["tgba_analysis"] = analyze_automaton_fallback(hoa_tgba)
-        else:
-            classification["tgba_analysis"] = tgba_stats
-            tgba_automaton_stutter_check = analyze_automaton_fallback(hoa_tgba).get(
-                "is_stutter_invariant"
-            )
-            classification["tgba_analysis"]["is_stutter_invariant"] = (
-                tgba_automaton_stutter_check
-            )
+        classification["tgba_analysis"] = plan.analyze(stutter_invariant)
 
         # Translate to Buchi (if possible) and analyze
-        hoa_buchi, buchi_stats = get_automaton_and_stats(
-            ltl_formula, to_buchi=True, to_deterministic=False
+        classification["buchi_analysis"] = plan.analyze(
+            stutter_invariant, to_buchi=True
         )
-        if "error" in buchi_stats:
-            _debug(f"Falling back to autfilt for Buchi analysis: {buchi_stats['error']}")
-            classification["buchi_analysis"] = analyze_automaton_fallback(hoa_buchi)
-        else:
-            classification["buchi_analysis"] = buchi_stats
-            buchi_automaton_stutter_check = analyze_automaton_fallback(hoa_buchi).get(
-                "is_stutter_invariant"
-            )
-            classification["buchi_analysis"]["is_stutter_invariant"] = (
-                buchi_automaton_stutter_check
-            )
 
         # Attempt to produce a deterministic automaton and analyze
-        hoa_deterministic, deterministic_stats = get_automaton_and_stats(
-            ltl_formula, to_buchi=False, to_deterministic=True
+        classification["deterministic_attempt"] = plan.deterministic_attempt(
+            stutter_invariant
         )
 
-        if "error" in deterministic_stats:
-            classification["deterministic_attempt"]["success"] = False
-            classification["deterministic_attempt"]["error"] = deterministic_stats["error"]
-        else:
-            classification["deterministic_attempt"]["success"] = True
-            classification["deterministic_attempt"][
-                "automaton_analysis"
-            ] = deterministic_stats
-            det_automaton_stutter_check = analyze_automaton_fallback(hoa_deterministic).get(
-                "is_stutter_invariant"
-            )
-            classification["deterministic_attempt"]["automaton_analysis"][
-                "is_stutter_invariant"
-            ] = det_automaton_stutter_check
-
         return classification
     finally:
         if verbose is not None:
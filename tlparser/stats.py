@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 from pyModelChecking import CTLS
+import copy
+import math
 import re
 import pprint
-from scipy.stats import entropy
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
+from tlparser.profiling import stage
+
 if TYPE_CHECKING:
     from tlparser.stats_ext import SpotAnalyzer
 
@@ -15,6 +21,28 @@ except Exception:  # noqa: BLE001
     _SpotAnalyzer = None
 
 
+@lru_cache(maxsize=None)
+def get_parser() -> CTLS.Parser:
+    """Return the process-wide CTLS parser (building the LALR tables is costly)."""
+    with stage("stats.parser_build"):
+        return CTLS.Parser()
+
+
+def entropy(counts, base: float = 2) -> float:
+    """Shannon entropy of unnormalised counts, as ``scipy.stats.entropy`` computes it.
+
+    Implemented here so that importing the CLI does not pull in scipy.
+    """
+    counts = list(counts)
+    total = sum(counts)
+    if not counts:
+        return 0.0
+    if total == 0:
+        return math.nan
+    h = 0.0 - sum(c / total * math.log(c / total) for c in counts if c)
+    return h / math.log(base)
+
+
 class Stats:
     def __init__(
         self,
@@ -70,23 +98,33 @@ class Stats:
 
         if len(self.formula_raw) > 0:
             # Replace comparison operators
-            self.cops, self.formula_parsable = self.analyse_comparison_ops(
-                self.formula_raw
-            )
+            with stage("stats.rewrite"):
+                self.cops, self.formula_parsable = self.analyse_comparison_ops(
+                    self.formula_raw
+                )
 
             # Parse the formula
-            p = CTLS.Parser()
-            self.formula_parsed = p(self.formula_parsable)
-            self.analyze_formula(self.formula_parsed)
+            parser = get_parser()
+            with stage("stats.parse"):
+                self.formula_parsed = parser(self.formula_parsable)
+            with stage("stats.ast_walk"):
+                self.analyze_formula(self.formula_parsed)
             self.agg = self.update_aggregates()
-            self.entropy = self.calc_entropy()
+            with stage("stats.entropy"):
+                self.entropy = self.calc_entropy()
 
             if extended:
                 analyzer = spot_analyzer
                 if analyzer is None and _SpotAnalyzer is not None:
                     analyzer = _SpotAnalyzer(verbose=spot_verbose)
                 if analyzer is not None:
-                    self.spot = analyzer.classify(self.formula_raw)
+                    # Analyzers that understand the parse can skip inapplicable formulas
+                    classify_parsed = getattr(analyzer, "classify_parsed", None)
+                    with stage("stats.spot"):
+                        if classify_parsed is not None:
+                            self.spot = classify_parsed(self)
+                        else:
+                            self.spot = analyzer.classify(self.formula_raw)
 
     @staticmethod
     def analyse_comparison_ops(formula_str):
@@ -220,7 +258,8 @@ class Stats:
     def __str__(self):
         return pprint.pformat(self.get_stats(), indent=2)
 
-    def get_requirement_text_stats(self, req_text: str) -> tuple[int | None, int | None, int | None]:
+    @staticmethod
+    def get_requirement_text_stats(req_text: str) -> tuple[int | None, int | None, int | None]:
         if req_text:
             cleaned_text = req_text.strip()
             if cleaned_text and cleaned_text[-1] not in '.!?':
@@ -231,3 +270,71 @@ class Stats:
             return char_count, word_count, sentence_count
         else:
             return None, None, None
+
+
+class StatsCache:
+    """Analyze every distinct formula of a digest once and hand out copies.
+
+    Rows sharing a formula differ only in their requirement-text statistics,
+    which are cheap and recomputed per row. Results are keyed by the formula
+    and whether the extended columns were requested. Parse failures are cached
+    too and a copy is raised for every row of the formula. When several
+    threads ask for the same new formula, one analyzes it and the others wait
+    for its result.
+    """
+
+    def __init__(self) -> None:
+        self._results: dict[tuple[str, bool], Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(
+        self, formula_str: str, req_text: str | None = None, **kwargs
+    ) -> dict:
+        """Return ``Stats(formula_str, req_text, **kwargs).get_stats()``."""
+        key = (formula_str, bool(kwargs.get("extended", False)))
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                future.set_result(Stats(formula_str, **kwargs).get_stats())
+            except Exception as exc:  # noqa: BLE001 - re-raised for every row
+                future.set_exception(exc)
+            except BaseException as exc:
+                # An interrupt says nothing about the formula; do not cache it
+                with self._lock:
+                    del self._results[key]
+                future.set_exception(exc)
+                raise
+        exc = future.exception()
+        if exc is not None:
+            # A fresh copy, so the cached one does not collect every traceback
+            raise copy.copy(exc)
+        cached = future.result()
+
+        # Rows must not share mutable containers
+        stats = {
+            key: copy.copy(value) if isinstance(value, (dict, set, list)) else value
+            for key, value in cached.items()
+        }
+        (
+            stats["req_len"],
+            stats["req_word_count"],
+            stats["req_sentence_count"],
+        ) = Stats.get_requirement_text_stats(req_text)
+        return stats
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
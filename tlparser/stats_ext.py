@@ -2,8 +2,102 @@
 
 from __future__ import annotations
 
+import copy
 import re
-from typing import Any, List
+import threading
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from tlparser.stats import Stats
+
+
+_SPOT_TOKEN = re.compile(r'\s+|"[^"]*"|<->|->|[A-Za-z_][A-Za-z0-9_]*|\d+|.')
+# Tokens kept as they are: operators, parentheses and constants
+_SPOT_FIXED = {"<->", "->", "!", "&", "|", "^", "(", ")", "true", "false", "xor"}
+_SPOT_FIXED.update("FGXURWM")
+# Lowercase identifiers are always a single proposition for Spot, whereas
+# uppercase letters may be glued operators (Spot reads ``GFa`` as ``G F a``)
+_SPOT_AP = re.compile(r"[a-z_][a-z0-9_]*")
+
+
+def canonical_shape(spot_formula: str) -> str | None:
+    """Relabel atomic propositions as ``p0, p1, ...`` in order of first occurrence.
+
+    Spot's verdicts and automaton metrics do not change under a consistent
+    renaming of atomic propositions, so all formulas of one shape (e.g.
+    ``G (a -> F b)`` and ``G (req -> F ack)``) can share one Spot pipeline.
+    Double-quoted propositions are relabelled too. Returns None when a token
+    is not plainly an operator or a proposition (e.g. unquoted identifiers
+    with uppercase letters, or comparisons); such formulas are only cached
+    verbatim.
+    """
+    names: dict[str, str] = {}
+    parts = []
+    for token in _SPOT_TOKEN.findall(spot_formula):
+        if token.isspace() or token.isdigit() or token in _SPOT_FIXED:
+            parts.append(token)
+        elif _SPOT_AP.fullmatch(token) or token.startswith('"'):
+            parts.append(names.setdefault(token, f"p{len(names)}"))
+        else:
+            return None
+    return "".join(parts)
+
+
+_NUMBER_MARKER = re.compile(r"n(\d+(?:\.\d+)?)")
+
+
+def to_spot_syntax(node: Any) -> str:
+    """Serialize a parsed CTLS formula (``Stats.formula_parsed``) as Spot LTL.
+
+    Atomic propositions keep the names ``Stats.analyse_comparison_ops`` gave
+    them (so ``x <= 7`` becomes ``x_leq_7``), minus the ``n`` it inserts
+    before numbers. Names other than lowercase identifiers are double-quoted,
+    so Spot never reads their uppercase letters as operators. Unary operators are written as ``G p`` and ``!p``;
+    operands that are binary operations are parenthesised.
+    Raises ValueError for nodes outside LTL, such as path quantifiers.
+    """
+    from pyModelChecking import CTLS
+
+    def operand(child: Any) -> str:
+        text = emit(child)
+        if isinstance(child, (CTLS.And, CTLS.Or, CTLS.Imply, CTLS.U, CTLS.R)):
+            return f"({text})"
+        return text
+
+    def emit(node: Any) -> str:
+        if isinstance(node, CTLS.Bool):
+            return "true" if node._value else "false"
+        if isinstance(node, CTLS.AtomicProposition):
+            name = _NUMBER_MARKER.sub(r"\1", str(node))
+            return name if _SPOT_AP.fullmatch(name) else f'"{name}"'
+        children = node._subformula
+        if isinstance(node, CTLS.Not):
+            return "!" + operand(children[0])
+        for cls, symbol in ((CTLS.X, "X"), (CTLS.F, "F"), (CTLS.G, "G")):
+            if isinstance(node, cls):
+                return f"{symbol} {operand(children[0])}"
+        for cls, symbol in (
+            (CTLS.And, "&"),
+            (CTLS.Or, "|"),
+            (CTLS.Imply, "->"),
+            (CTLS.U, "U"),
+            (CTLS.R, "R"),
+        ):
+            if isinstance(node, cls):
+                return f" {symbol} ".join(operand(child) for child in children)
+        raise ValueError(f"{type(node).__name__} has no Spot LTL equivalent")
+
+    return emit(node)
+
+
+def _replace_in_strings(value: Any, old: str, new: str) -> Any:
+    if isinstance(value, str):
+        return value.replace(old, new)
+    if isinstance(value, dict):
+        return {k: _replace_in_strings(v, old, new) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace_in_strings(v, old, new) for v in value]
+    return value
 
 
 class SpotAnalyzer:
@@ -15,6 +109,11 @@ class SpotAnalyzer:
         self._classify = None
         self._verbose = verbose
         self._issue_map: dict[str, set[str]] = {}
+        self._results: dict[str, dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self.lookups = 0
+        self.pipeline_runs = 0
+        self.skipped: dict[str, int] = {}
         self._token_patterns = (
             (re.compile(r"-->", re.IGNORECASE), "->"),
             (re.compile(r"\bnot\b", re.IGNORECASE), "!"),
@@ -34,11 +133,29 @@ class SpotAnalyzer:
             for formula in sorted(self._issue_map)
         ]
 
+    def issues_for(self, formula: str) -> List[str]:
+        """Return the sorted issues recorded for a single formula."""
+        return sorted(self._issue_map.get(formula, ()))
+
+    @property
+    def cached_results(self) -> int:
+        """Number of distinct formula shapes whose Spot results are cached."""
+        return len(self._results)
+
+    def warm_up(self) -> bool:
+        """Discover the Spot tools now instead of on the first formula."""
+        return self._ensure_initialized()
+
     def _record_warning(self, message: str) -> None:
-        if message not in self._diagnostics:
-            self._diagnostics.append(message)
+        with self._lock:
+            if message not in self._diagnostics:
+                self._diagnostics.append(message)
 
     def _ensure_initialized(self) -> bool:
+        with self._lock:
+            return self._initialize()
+
+    def _initialize(self) -> bool:
         if self._available is not None:
             return self._available
 
@@ -81,6 +198,33 @@ class SpotAnalyzer:
         self._available = True
         return True
 
+    @staticmethod
+    def skip_reason(stats: "Stats") -> str | None:
+        """Return why a parsed formula is outside Spot's LTL fragment, if it is."""
+        if stats.tops.get("A") or stats.tops.get("E"):
+            return "path quantifiers (CTL*)"
+        return None
+
+    def classify_parsed(self, stats: "Stats") -> dict[str, Any] | None:
+        """Classify a parsed formula, skipping Spot for formulas it cannot handle.
+
+        Formulas outside the LTL fragment get an immediate "not applicable"
+        classification instead of a series of failing Spot invocations.
+        """
+        if not stats.formula_raw or not self._ensure_initialized():
+            return None
+        reason = self.skip_reason(stats)
+        if reason is None:
+            spot_formula = to_spot_syntax(stats.formula_parsed)
+            return self._classify_spot(stats.formula_raw, spot_formula)
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+        return {
+            "formula": stats.formula_raw,
+            "spot_formula": None,
+            "skip_reason": f"not applicable: {reason}",
+        }
+
     def classify(self, formula: str) -> dict[str, Any] | None:
         """Return Spot-derived statistics for the given formula if possible."""
         if not formula:
@@ -89,10 +233,12 @@ class SpotAnalyzer:
         if not self._ensure_initialized():
             return None
 
+        return self._classify_spot(formula, self._to_spot_syntax(formula))
+
+    def _classify_spot(self, formula: str, spot_formula: str) -> dict[str, Any] | None:
         assert self._classify is not None  # For type checkers
-        spot_formula = self._to_spot_syntax(formula)
         try:
-            result = self._classify(spot_formula, verbose=self._verbose)
+            result = self._cached_classify(spot_formula)
             if isinstance(result, dict):
                 original_spot = result.get("formula", spot_formula)
                 result["spot_formula"] = original_spot
@@ -112,6 +258,28 @@ class SpotAnalyzer:
             )
         return None
 
+    def _cached_classify(self, spot_formula: str) -> dict[str, Any] | None:
+        """Run the Spot pipeline once per formula shape and hand out copies.
+
+        The pipeline runs on the AP-relabelled shape; the formula text in the
+        result (including error messages) is mapped back to ``spot_formula``.
+        """
+        key = canonical_shape(spot_formula) or spot_formula
+        with self._lock:
+            self.lookups += 1
+            cached = self._results.get(key)
+        if cached is None:
+            with self._lock:
+                self.pipeline_runs += 1
+            cached = self._classify(key, verbose=self._verbose)
+            if not isinstance(cached, dict):
+                return cached
+            with self._lock:
+                cached = self._results.setdefault(key, cached)
+        if key == spot_formula:
+            return copy.deepcopy(cached)
+        return _replace_in_strings(cached, key, spot_formula)
+
     def _to_spot_syntax(self, formula: str) -> str:
         """Translate friendly syntax (not/and/or/-->) to Spot-compatible operators."""
         translated = formula
@@ -166,5 +334,6 @@ class SpotAnalyzer:
                 issues.append("deterministic_attempt")
 
         if issues:
-            entries = self._issue_map.setdefault(formula, set())
-            entries.update(issues)
+            with self._lock:
+                entries = self._issue_map.setdefault(formula, set())
+                entries.update(issues)
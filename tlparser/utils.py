@@ -1,17 +1,22 @@
+import hashlib
 import json
-import openpyxl
 import os
-import pandas as pd
+import threading
+import zlib
 from contextlib import nullcontext
 from datetime import datetime
-from typing import Callable, Sequence, Tuple
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Sequence, Tuple
 
 import click
 
 from tlparser.config import Configuration
-from tlparser.stats import Stats
+from tlparser.profiling import stage
+from tlparser.stats import Stats, StatsCache
 from tlparser.stats_ext import SpotAnalyzer
 
+if TYPE_CHECKING:
+    from tlparser.journal import Journal
+
 
 class Utils:
 
@@ -19,6 +24,7 @@ class Utils:
         self.config = config
         self.warnings: list[str] = []
         self.spot_issues: list[tuple[str, list[str]]] = []
+        self.failures: list[dict] = []
 
     def read_formulas_from_json(
         self,
@@ -26,56 +32,205 @@ class Utils:
         extended: bool = False,
         verbose: bool = False,
         progress_factory: Callable[[int], object] | None = None,
+        spot_analyzer: SpotAnalyzer | None = None,
+        entries: list[dict] | None = None,
+        shard: tuple[int, int] | None = None,
+        journal: "Journal | None" = None,
+        cache: StatsCache | None = None,
+        stop: threading.Event | None = None,
     ):
+        """Analyze every logic of the entries and return the digest rows.
+
+        When ``stop`` is set (e.g. by another thread on Ctrl-C), the digest
+        raises KeyboardInterrupt before its next row; rows already written to
+        the journal are kept for ``--resume``.
+        """
         self.warnings.clear()
         self.spot_issues = []
+        self.failures = []
 
-        spot_analyzer = self._create_spot_analyzer(extended, verbose)
+        if spot_analyzer is None:
+            spot_analyzer = self._create_spot_analyzer(extended, verbose)
 
-        with open(self.config.file_data_in, "r") as file:
-            data = json.load(file)
+        data = self.load_entries() if entries is None else entries
         parsed_formulas = []
 
-        ids = [item["id"] for item in data]
-        if len(ids) != len(set(ids)):
-            raise ValueError("Duplicate IDs found, abort...")
         progress_cm = nullcontext()
         if progress_factory is not None:
-            total = sum(
-                len(entry.get("logics", []))
-                for entry in data
-                if entry.get("status") in self.config.only_with_status
-            )
-            progress_cm = progress_factory(total)
+            progress_cm = progress_factory(self.count_formulas(data, shard))
 
+        resumed_issues: dict[str, set[str]] = {}
         with progress_cm as progress:
-            for entry in data:
-                if entry["status"] in self.config.only_with_status:
-                    for logic in entry["logics"]:
-                        s = Stats(
-                            formula_str=logic["f_code"],
-                            req_text=entry["text"],
-                            extended=extended,
-                            spot_analyzer=spot_analyzer,
-                            spot_verbose=verbose,
-                        )
-                        parsed_formulas.append(
-                            {
-                                "id": entry["id"],
-                                "text": entry["text"],
-                                "type": logic["type"],
-                                "translation": logic["translation"],
-                                "reasoning": logic["reasoning"],
-                                "stats": s.get_stats(),
-                            }
+            for seq, entry, logic in self.iter_tasks(data, shard):
+                if stop is not None and stop.is_set():
+                    raise KeyboardInterrupt
+                record = None
+                if journal is not None:
+                    record = journal.completed.get((entry["id"], logic["type"]))
+                if record is not None:
+                    item = record["item"]
+                    if record.get("issues"):
+                        formula = item["stats"]["formula_raw"]
+                        resumed_issues.setdefault(formula, set()).update(
+                            record["issues"]
                         )
-                        if progress is not None:
-                            progress.update(1)
+                else:
+                    try:
+                        with stage("utils.analyze_row"):
+                            item = self.analyze_logic(
+                                entry,
+                                logic,
+                                extended=extended,
+                                spot_analyzer=spot_analyzer,
+                                verbose=verbose,
+                                cache=cache,
+                            )
+                    except Exception as exc:  # noqa: BLE001 - keep the batch going
+                        item = self.error_item(entry, logic, exc)
+                    if shard is not None:
+                        item["seq"] = seq
+                    if journal is not None:
+                        issues = None
+                        if spot_analyzer is not None:
+                            issues = spot_analyzer.issues_for(
+                                item["stats"]["formula_raw"]
+                            )
+                        journal.append(item, issues)
+                parsed_formulas.append(item)
+                if item.get("error"):
+                    self.failures.append(item)
+                if progress is not None:
+                    progress.update(1)
         if spot_analyzer is not None:
+            # A shared analyzer may have seen other files; keep only our formulas
+            seen = {item["stats"]["formula_raw"] for item in parsed_formulas}
             self.warnings.extend(spot_analyzer.diagnostics)
-            self.spot_issues.extend(spot_analyzer.issue_entries())
+            for formula, problems in spot_analyzer.issue_entries():
+                if formula in seen:
+                    resumed_issues.setdefault(formula, set()).update(problems)
+        self.spot_issues.extend(
+            (formula, sorted(resumed_issues[formula]))
+            for formula in sorted(resumed_issues)
+        )
         return parsed_formulas
 
+    def iter_tasks(self, data: list[dict], shard: tuple[int, int] | None = None):
+        """Yield ``(seq, entry, logic)`` for every logic to digest.
+
+        ``seq`` is the position of the logic in a single-node run, which is
+        what shard merges and queue collection order by.
+        """
+        seq = -1
+        for entry in data:
+            if entry["status"] in self.config.only_with_status:
+                in_shard = shard is None or self.in_shard(entry["id"], shard)
+                for logic in entry["logics"]:
+                    seq += 1
+                    if in_shard:
+                        yield seq, entry, logic
+
+    @staticmethod
+    def analyze_logic(
+        entry: dict,
+        logic: dict,
+        *,
+        extended: bool = False,
+        spot_analyzer: SpotAnalyzer | None = None,
+        verbose: bool = False,
+        cache: StatsCache | None = None,
+    ) -> dict:
+        options = dict(
+            extended=extended, spot_analyzer=spot_analyzer, spot_verbose=verbose
+        )
+        if cache is not None:
+            stats = cache.get_stats(logic["f_code"], entry["text"], **options)
+        else:
+            stats = Stats(logic["f_code"], entry["text"], **options).get_stats()
+        return {
+            "id": entry["id"],
+            "text": entry["text"],
+            "type": logic["type"],
+            "translation": logic["translation"],
+            "reasoning": logic["reasoning"],
+            "stats": stats,
+        }
+
+    @staticmethod
+    def error_item(entry: dict, logic: dict, exc: Exception) -> dict:
+        """Build the row of a logic that could not be analyzed."""
+        return {
+            "id": entry["id"],
+            "text": entry["text"],
+            "type": logic["type"],
+            "translation": logic["translation"],
+            "reasoning": logic["reasoning"],
+            "stats": {"formula_raw": logic["f_code"]},
+            "error": f"{type(exc).__name__}: {str(exc).strip()}",
+        }
+
+    @staticmethod
+    def serialize_item(item: dict) -> dict:
+        """Return a JSON-compatible copy of a digest item (sets become sorted lists)."""
+        return {**item, "stats": Stats._sanitize_for_json(item["stats"])}
+
+    def load_entries(self) -> list[dict]:
+        with stage("utils.load_json"), open(self.config.file_data_in, "r") as file:
+            data = json.load(file)
+
+        ids = [item["id"] for item in data]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Duplicate IDs found, abort...")
+        return data
+
+    def count_formulas(
+        self, data: list[dict], shard: tuple[int, int] | None = None
+    ) -> int:
+        return sum(
+            len(entry.get("logics", []))
+            for entry in data
+            if entry.get("status") in self.config.only_with_status
+            and (shard is None or self.in_shard(entry["id"], shard))
+        )
+
+    @staticmethod
+    def in_shard(entry_id, shard: tuple[int, int]) -> bool:
+        """Return whether a requirement belongs to shard ``(index, count)`` (1-based).
+
+        Requirements are assigned by a CRC32 of their id, which is stable across
+        machines and Python processes (unlike ``hash``), and all logics of one
+        id always land in the same shard.
+        """
+        index, count = shard
+        return zlib.crc32(str(entry_id).encode("utf-8")) % count == index - 1
+
+    def merge_shards(self, files: Sequence[str]) -> tuple[list[dict], list[int]]:
+        """Combine shard outputs in single-node order.
+
+        Returns the merged rows (without the ``seq`` column) and the positions
+        below the highest merged one that none of the given shards covered.
+        """
+        import pandas as pd
+
+        frames = []
+        for file in files:
+            frame = pd.read_excel(file)
+            if frame.empty and len(frame.columns) == 0:
+                continue  # A shard without requirements
+            if "seq" not in frame.columns:
+                raise ValueError(f"{file} is not a shard output (no 'seq' column).")
+            frames.append(frame)
+        if not frames:
+            return [], []
+        df = pd.concat(frames, ignore_index=True)
+        if df["seq"].duplicated().any():
+            raise ValueError("Shard outputs overlap, abort...")
+        df = df.sort_values("seq", kind="stable")
+        seqs = df["seq"].astype(int)
+        missing = sorted(set(range(seqs.max() + 1 if len(seqs) else 0)) - set(seqs))
+        df = df.drop(columns="seq").astype(object)
+        rows = df.where(df.notna(), None).to_dict(orient="records")
+        return rows, missing
+
     def save_spot_issue_report(self, path: str) -> None:
         if not self.spot_issues:
             return
@@ -89,6 +244,29 @@ class Utils:
         with open(path, "w", encoding="utf-8") as fh:
             fh.write("\n".join(lines).rstrip() + "\n")
 
+    def save_failure_report(self, path: str) -> None:
+        if not self.failures:
+            return
+        lines = ["# Failed Formulas", ""]
+        for item in self.failures:
+            lines.extend(
+                [
+                    f"## Requirement {item['id']} ({item['type']})",
+                    "```",
+                    item["stats"]["formula_raw"],
+                    "```",
+                    "",
+                    "### Error",
+                    "```",
+                    item["error"],
+                    "```",
+                    "",
+                ]
+            )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines).rstrip() + "\n")
+
     def analyze_single_formula(
         self,
         formula: str,
@@ -96,11 +274,14 @@ class Utils:
         extended: bool = False,
         requirement_text: str | None = None,
         verbose: bool = False,
+        spot_analyzer: SpotAnalyzer | None = None,
     ) -> Stats:
         self.warnings.clear()
         self.spot_issues = []
 
-        spot_analyzer = self._create_spot_analyzer(extended, verbose)
+        shared = spot_analyzer is not None
+        if not shared:
+            spot_analyzer = self._create_spot_analyzer(extended, verbose)
 
         stats = Stats(
             formula_str=formula,
@@ -110,12 +291,67 @@ class Utils:
             spot_verbose=verbose,
         )
 
-        if spot_analyzer is not None:
+        if shared:
+            # A shared analyzer has seen other formulas; report only this one
+            issues = spot_analyzer.issues_for(formula) if extended else []
+            if issues:
+                self.spot_issues.append((formula, issues))
+        elif spot_analyzer is not None:
             self.warnings.extend(spot_analyzer.diagnostics)
             self.spot_issues.extend(spot_analyzer.issue_entries())
 
         return stats
 
+    def iter_evaluate(
+        self,
+        lines: Iterable[str],
+        *,
+        extended: bool = False,
+        verbose: bool = False,
+    ) -> Iterator[dict]:
+        """Analyze one formula per line and yield each result as soon as it is ready.
+
+        A line holds either a bare formula or a ``{"formula": ..., "text": ...}``
+        JSON object; empty lines are skipped. Lines that cannot be analysed yield
+        ``{"line": n, "error": ...}`` instead of stopping the stream. One Spot
+        analyzer is shared by all lines so its discovery and caches stay warm.
+        """
+        self.warnings.clear()
+        self.spot_issues = []
+        spot_analyzer = self._create_spot_analyzer(extended, verbose)
+
+        for number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                formula, requirement_text = self.parse_evaluate_line(line)
+                stats = Stats(
+                    formula_str=formula,
+                    req_text=requirement_text,
+                    extended=extended,
+                    spot_analyzer=spot_analyzer,
+                    spot_verbose=verbose,
+                )
+                result = stats.as_serializable()
+            except Exception as exc:  # noqa: BLE001 - reported in the stream
+                result = {"line": number, "error": f"{type(exc).__name__}: {exc}"}
+            yield result
+
+        if spot_analyzer is not None:
+            self.warnings.extend(spot_analyzer.diagnostics)
+            self.spot_issues.extend(spot_analyzer.issue_entries())
+
+    @staticmethod
+    def parse_evaluate_line(line: str) -> Tuple[str, str | None]:
+        """Split a batch line into its formula and optional requirement text."""
+        if not line.startswith("{"):
+            return line, None
+        record = json.loads(line)
+        if not isinstance(record, dict) or not isinstance(record.get("formula"), str):
+            raise ValueError('Expected a JSON object with a "formula" string.')
+        return record["formula"], record.get("text")
+
     def _create_spot_analyzer(
         self, extended: bool, verbose: bool
     ) -> SpotAnalyzer | None:
@@ -159,60 +395,90 @@ class Utils:
         for line in rest:
             click.echo(f"{indent} {line}", err=True)
 
-    def write_to_excel(self, data):
-        flattened_data = [self.flatten_dict(item) for item in data]
+    def flatten_rows(self, data):
+        """Flatten digest items into output rows, including the translation class"""
+        from tlparser.postprocess import add_translation_class
 
-        # Derive and append translation class
-        df = pd.DataFrame(flattened_data)
-        type_order = self.config.logic_order
-        df["type"] = pd.Categorical(df["type"], categories=type_order, ordered=True)
-        df_sorted = df.sort_values(by=["id", "type"])
-        df["translationclass"] = df_sorted.groupby("id")["translation"].transform(
-            lambda x: "".join([v[0] for v in x])
-        )
+        with stage("utils.flatten"):
+            flattened_data = [self.flatten_dict(item) for item in data]
+
+            # Derive and append translation class (ids are only unique per source)
+            group_by = ("source", "id") if any("source" in i for i in data) else ("id",)
+            add_translation_class(flattened_data, self.config.logic_order, group_by)
+        return flattened_data
 
-        flattened_data = df.to_dict(orient="records")
+    def write_to_excel(self, data, prefix: str | None = None):
+        return self.write_rows_to_excel(self.flatten_rows(data), prefix)
+
+    def to_dataframe(self, data):
+        """The sheet `write_to_excel` would write, as a DataFrame"""
+        import pandas as pd
+
+        flattened_data = self.flatten_rows(data)
+        with stage("utils.dataframe"):
+            headers = self.order_headers(flattened_data)
+            rows = [
+                [self.cell_value(item.get(h)) for h in headers]
+                for item in flattened_data
+            ]
+            return pd.DataFrame(rows, columns=headers)
+
+    @staticmethod
+    def order_headers(flattened_data):
         headers = {key for item in flattened_data for key in item.keys()}
 
         # Sort headers according to predefined order, with any extra headers at the end
-        include_extended = any("stats.spot" in entry for entry in flattened_data)
+        include_extended = any(header.startswith("stats.spot") for header in headers)
         predefined_order = Utils.get_column_order(extended=include_extended)
-        headers = [header for header in predefined_order if header in headers] + [
+        return [header for header in predefined_order if header in headers] + [
             header for header in headers if header not in predefined_order
         ]
 
-        # Create a new workbook and select the active worksheet
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
+    @staticmethod
+    def cell_value(value):
+        """The value of a row field as written to a spreadsheet cell"""
+        if (
+            value is None
+            or value == ""
+            or (isinstance(value, (set, list)) and len(value) == 0)
+        ):
+            return None
+        if isinstance(value, int) or isinstance(value, float):
+            return value
+        if isinstance(value, (set, list)):
+            # Sorted so that reruns and shard merges are reproducible
+            return " | ".join(sorted(value))
+        return str(value)
+
+    def write_rows_to_excel(self, flattened_data, prefix: str | None = None):
+        headers = self.order_headers(flattened_data)
+
+        import openpyxl
 
-        # Write the headers to the first row
-        for col, header in enumerate(headers, start=1):
-            sheet.cell(row=1, column=col, value=header)
+        with stage("utils.excel_write"):
+            # Create a new workbook and select the active worksheet
+            workbook = openpyxl.Workbook()
+            sheet = workbook.active
 
-        # Write the data to the sheet
-        for row, item in enumerate(flattened_data, start=2):
+            # Write the headers to the first row
             for col, header in enumerate(headers, start=1):
-                value = item.get(header)
-                if (
-                    value is None
-                    or value == ""
-                    or (isinstance(value, set) and len(value) == 0)
-                ):
-                    sheet.cell(row=row, column=col, value=None)
-                elif isinstance(value, int) or isinstance(value, float):
+                sheet.cell(row=1, column=col, value=header)
+
+            # Write the data to the sheet
+            for row, item in enumerate(flattened_data, start=2):
+                for col, header in enumerate(headers, start=1):
+                    value = self.cell_value(item.get(header))
                     sheet.cell(row=row, column=col, value=value)
-                elif isinstance(value, set):
-                    sheet.cell(row=row, column=col, value=" | ".join(value))
-                else:
-                    sheet.cell(row=row, column=col, value=str(value))
 
         # Save the workbook to a file
         os.makedirs(self.config.folder_data_out, exist_ok=True)
-        prefix = self.extract_filename_without_suffix(self.config.file_data_in)
+        if prefix is None:
+            prefix = self.extract_filename_without_suffix(self.config.file_data_in)
         out = os.path.join(
             self.config.folder_data_out, f"{prefix}_{self.get_unique_filename()}.xlsx"
         )
-        workbook.save(out)
+        with stage("utils.excel_save"):
+            workbook.save(out)
         return out
 
     @staticmethod
@@ -236,6 +502,12 @@ class Utils:
         base_name = os.path.basename(file_path)
         return os.path.splitext(base_name)[0]
 
+    @staticmethod
+    def path_digest(file_path):
+        """Short hash of the absolute path, to tell same-named files apart"""
+        absolute = os.path.abspath(file_path).encode("utf-8")
+        return hashlib.sha1(absolute).hexdigest()[:8]
+
     @staticmethod
     def get_latest_excel(folder):
         excel_files = [f for f in os.listdir(folder) if f.endswith(".xlsx")]
@@ -266,6 +538,7 @@ class Utils:
     @staticmethod
     def get_column_order(extended: bool = False):
         base_columns = [
+            "source",
             "id",
             "text",
             "type",
@@ -304,6 +577,7 @@ class Utils:
             "stats.entropy.lops",
             "stats.entropy.tops",
             "stats.entropy.lops_tops",
+            "error",
         ]
         if not extended:
             return base_columns
@@ -311,6 +585,7 @@ class Utils:
         spot_columns = [
             "stats.spot.formula",
             "stats.spot.spot_formula",
+            "stats.spot.skip_reason",
             "stats.spot.syntactic_safety",
             "stats.spot.is_stutter_invariant_formula",
             "stats.spot.manna_pnueli_class",
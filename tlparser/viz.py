@@ -1,22 +1,73 @@
 import os
 import math
+import multiprocessing.util
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.io as pio
-
-pio.kaleido.scope.mathjax = None
-
+from matplotlib.lines import Line2D
 import networkx as nx
 from pyvis.network import Network
 import seaborn as sns
 from d3blocks import D3Blocks
 
 from tlparser.config import Configuration
+from tlparser.export import ExportManager
+from tlparser import profiling
+from tlparser.plot_cache import PlotCache
 from tlparser.utils import Utils
 
+DENSITY_GRID_POINTS = 200
+DENSITY_MAX_BINS = 40
+
+
+def _smoothed_density(values, bw_method=0.5, points=DENSITY_GRID_POINTS):
+    """
+    Gaussian KDE evaluated on a grid, approximated by binning the values and
+    convolving the histogram with the kernel (linear in the number of values).
+    Bandwidth and grid extent follow seaborn (bw_method * std, cut=2).
+    Returns (grid, density); both empty if there is nothing to estimate.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if values.size < 2 or values.std() == 0:
+        return np.empty(0), np.empty(0)
+    bandwidth = bw_method * values.std(ddof=1)
+    low, high = values.min() - 2 * bandwidth, values.max() + 2 * bandwidth
+    counts, edges = np.histogram(values, bins=points, range=(low, high))
+    step = edges[1] - edges[0]
+    radius = int(np.ceil(4 * bandwidth / step))
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) * step / bandwidth) ** 2)
+    density = np.convolve(counts, kernel)[radius : radius + points]
+    density = density / (density.sum() * step)
+    return (edges[:-1] + edges[1:]) / 2, density
+
+
+def _distinct_values(values, points=DENSITY_GRID_POINTS):
+    """Distinct values, snapped to a grid of `points` steps if there are more"""
+    values = np.unique(values)
+    if values.size <= points:
+        return values
+    step = (values[-1] - values[0]) / points
+    return np.unique(values[0] + np.round((values - values[0]) / step) * step)
+
+
+def _bin_edges(values, max_bins=DENSITY_MAX_BINS):
+    """Bin edges for a metric: one bin per integer for small integer ranges"""
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    low, high = (values.min(), values.max()) if values.size else (0.0, 1.0)
+    is_integral = np.all(values == np.round(values))
+    if is_integral and high - low < max_bins:
+        return np.arange(low - 0.5, high + 1.5)
+    if low == high:
+        high = low + 1
+    return np.linspace(low, high, max_bins + 1)
+
 
 class Viz:
     title_map = {
@@ -31,21 +82,141 @@ class Viz:
         "stats.req_word_count": ["Requirement Words", "Word Count"],
     }
     translatability = ["yes", "no", "depends"]
+    plot_methods = {
+        "hist": "plot_histogram",
+        "viol": "plot_violin_engcompl",
+        "viol_req": "plot_violin_reqtext",
+        "pair": "plot_pairplot",
+        "chord": "plot_chord",
+        "sankey": "plot_sankey",
+        "dag": "plot_dag_interactive",
+    }
+    # Digest columns each plot reads: (exact names, substrings of names)
+    plot_inputs = {
+        "hist": (["type", "translation"], []),
+        "viol": (
+            ["id", "type", "translation", "stats.asth", "stats.entropy.lops_tops"],
+            [".agg."],
+        ),
+        "viol_req": (["id", "type", "translation"], [".req_"]),
+        "pair": (
+            ["type", "translation", "stats.asth", "stats.entropy.lops_tops"],
+            [".agg."],
+        ),
+        "chord": (["id", "type", "translation"], []),
+        "sankey": (["id", "type", "translation"], []),
+        "dag": (["id", "type", "translation"], []),
+    }
 
-    def __init__(self, config: Configuration, file, selfonly=False):
+    # Above this many plotted values, violins and pair plots are drawn from
+    # precomputed densities instead of every single value
+    density_threshold = 50_000
+
+    def __init__(
+        self,
+        config: Configuration,
+        file,
+        selfonly=False,
+        stamp=None,
+        plots=None,
+        density=None,
+    ):
         self.config = config
-        self.data = pd.read_excel(file)
+        self.density = density  # None: decided per plot by density_threshold
+        self.exports = ExportManager()
+        # All outputs of one run share a timestamp, whichever process renders them
+        self.stamp = stamp or Utils.get_unique_filename()
+        self.selfonly = selfonly
+        with profiling.stage("viz.load"):
+            self.data = self.load_dataset(file, plots)
         if selfonly:
             selftypes = self.data[self.data["translation"] == "self"]["type"].unique()
             self.data = self.data[self.data["type"].isin(selftypes)]
 
+    @classmethod
+    def from_dataset_cache(cls, config: Configuration, path, stamp, density=None):
+        """Rebuild a Viz from a dataset pickled by `render_plots`"""
+        viz = cls.__new__(cls)
+        viz.config = config
+        viz.stamp = stamp
+        viz.density = density
+        viz.exports = ExportManager()
+        viz.selfonly = False  # Already applied by the parent
+        viz.data = pd.read_pickle(path)
+        return viz
+
     def __get_file_name(self, prefix, suffix=".pdf"):
         os.makedirs(self.config.folder_data_out, exist_ok=True)
         return os.path.join(
             self.config.folder_data_out,
-            f"{prefix}_{Utils.get_unique_filename()}{suffix}",
+            f"{prefix}_{self.stamp}{suffix}",
         )
 
+    def render(self, plot):
+        """Render `plot`; its plotly figures are written by `exports.flush()`"""
+        with profiling.stage(f"viz.{plot}"):
+            return getattr(self, self.plot_methods[plot])()
+
+    @classmethod
+    def is_plot_input(cls, plot, column):
+        names, substrings = cls.plot_inputs[plot]
+        return column in names or any(part in column for part in substrings)
+
+    def plot_data(self, plot):
+        """The digest columns `plot` depends on"""
+        columns = [c for c in self.data.columns if self.is_plot_input(plot, c)]
+        return self.data[columns]
+
+    def load_dataset(self, file, plots=None):
+        """
+        Read a digest from an Excel file or take it from a DataFrame (such as
+        `Utils.to_dataframe`), keeping only the columns the given plots need
+        (all columns if plots is None). `id`, `type` and `translation` become
+        categoricals, with `type` ordered by the logic order, and numeric
+        metrics are downcast.
+        """
+        usecols = None
+        if plots is not None:
+            plots = list(plots)
+
+            def usecols(column):
+                return column in ("id", "type", "translation") or any(
+                    self.is_plot_input(plot, column) for plot in plots
+                )
+
+        if isinstance(file, pd.DataFrame):
+            columns = [c for c in file.columns if usecols is None or usecols(c)]
+            data = file[columns].copy()
+        else:
+            data = pd.read_excel(file, usecols=usecols)
+        data["id"] = data["id"].astype("category")
+        data["type"] = self.__order_types(data["type"])
+        data["translation"] = data["translation"].astype("category")
+        for column in data.columns:
+            series = data[column]
+            if not column.startswith("stats.") or not pd.api.types.is_numeric_dtype(
+                series
+            ):
+                continue
+            if pd.api.types.is_bool_dtype(series):
+                continue
+            downcast = "integer" if pd.api.types.is_integer_dtype(series) else "float"
+            data[column] = pd.to_numeric(series, downcast=downcast)
+        return data
+
+    def __use_density(self, values):
+        if self.density is not None:
+            return self.density
+        return values > self.density_threshold
+
+    def __order_types(self, types):
+        """Ordered categorical of the logics present in `types`, in logic order"""
+        present = set(types.dropna().unique())
+        categories = [t for t in self.config.logic_order if t in present]
+        categories += sorted(present - set(categories))
+        values = np.asarray(types, dtype=object)  # Recode from the values
+        return pd.Categorical(values, categories=categories, ordered=True)
+
     def __get_reduced_logic_order(self):
         return [
             item
@@ -53,6 +224,40 @@ class Viz:
             if item in self.data["type"].unique()
         ]
 
+    @cached_property
+    def translation_flows(self):
+        """
+        Flows from the natural formalization of each requirement to its other
+        logics, as one row per (source, target, translation) with the number of
+        distinct requirement ids and of rows. Shared by sankey, chord and DAG.
+        """
+        data = self.data[["id", "type", "translation"]]
+        sources = (
+            data[data["translation"] == "self"]
+            .drop_duplicates("id")[["id", "type"]]
+            .rename(columns={"type": "source"})
+        )
+        targets = data[data["translation"].isin(self.translatability)].rename(
+            columns={"type": "target"}
+        )
+        links = targets.merge(sources, on="id")
+        links["translation"] = pd.Categorical(
+            links["translation"].astype(str), categories=self.translatability
+        )
+        flows = (
+            links.groupby(["translation", "source", "target"], observed=True, sort=True)
+            .agg(ids=("id", "nunique"), rows=("id", "size"))
+            .reset_index()
+        )
+        return flows.astype({"source": str, "target": str})
+
+    def __get_cross_flows(self, translation):
+        """Rows of `translation_flows` between two different logics"""
+        flows = self.translation_flows
+        return flows[
+            (flows["translation"] == translation) & (flows["source"] != flows["target"])
+        ]
+
     def plot_histogram(self):
         reduced_order = self.__get_reduced_logic_order()
         type_palette = self.config.color_palette
@@ -123,11 +328,114 @@ class Viz:
         plt.close()
         return out
 
+    def __draw_violins(self, ax, data, include_strip=False):
+        type_palette = self.config.color_palette
+        violin = sns.violinplot(
+            x="type",
+            y="value",
+            data=data,
+            hue="type",
+            palette=type_palette,
+            bw_method=0.5,
+            edgecolor="black",
+            linewidth=1,
+            linecolor="k",
+            ax=ax,
+            inner=None,
+            legend=False,
+        )
+        sns.boxplot(
+            x="type",
+            y="value",
+            hue="type",
+            palette=type_palette,
+            data=data,
+            width=0.12,
+            showcaps=True,
+            showbox=True,
+            whiskerprops={"linewidth": 1.2, "color": "black"},
+            medianprops={"linewidth": 1.2, "color": "black"},
+            ax=ax,
+            fliersize=5,
+        )
+
+        for violin_part in violin.collections:
+            violin_part.set_alpha(0.6)
+
+        if include_strip:
+            sns.stripplot(
+                x="type",
+                y="value",
+                hue="type",
+                data=data,
+                alpha=0.3,
+                palette=type_palette,
+                size=3,
+                marker="d",
+                edgecolor="black",
+                linewidth=1,
+                ax=ax,
+                dodge=False,
+            )
+
+    def __draw_density_violins(self, ax, data, types):
+        """Violins and boxes from per-type densities and quartiles"""
+        boxes, positions, colors = [], [], []
+        for position, (logic, group) in enumerate(
+            data.groupby("type", observed=False)["value"]
+        ):
+            values = group.to_numpy(dtype=float)
+            values = values[np.isfinite(values)]
+            if values.size == 0:
+                continue
+            color = self.config.color_palette.get(logic)
+            grid, density = _smoothed_density(values)
+            if grid.size:
+                half_width = 0.4 * density / density.max()
+                ax.fill_betweenx(
+                    grid,
+                    position - half_width,
+                    position + half_width,
+                    facecolor=color,
+                    edgecolor="black",
+                    linewidth=1,
+                    alpha=0.6,
+                )
+            q1, median, q3 = np.percentile(values, [25, 50, 75])
+            low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            boxes.append(
+                {
+                    "med": median,
+                    "q1": q1,
+                    "q3": q3,
+                    "whislo": values[values >= low].min(),
+                    "whishi": values[values <= high].max(),
+                    "fliers": _distinct_values(values[(values < low) | (values > high)]),
+                }
+            )
+            positions.append(position)
+            colors.append(color)
+
+        if boxes:
+            artists = ax.bxp(
+                boxes,
+                positions=positions,
+                widths=0.12,
+                patch_artist=True,
+                whiskerprops={"linewidth": 1.2, "color": "black"},
+                medianprops={"linewidth": 1.2, "color": "black"},
+                flierprops={"markersize": 5},
+            )
+            for box, color in zip(artists["boxes"], colors):
+                box.set_facecolor(color)
+        ax.set_xticks(range(len(types)), types)
+        ax.set_xlim(-0.5, len(types) - 0.5)
+
     def _plot_violin(
         self, df_long, stats_values, metrics, title_map, out_prefix, include_strip=False
     ):
-        type_palette = self.config.color_palette
-        number_of_types = df_long["type"].unique().size
+        types = list(df_long["type"].cat.categories)
+        number_of_types = len(types)
 
         fig, axes = plt.subplots(
             nrows=2 if len(metrics) > 3 else 1,
@@ -141,54 +449,12 @@ class Viz:
         i = 1
 
         for ax, agg in zip(axes, metrics):
-            y_max = df_long[df_long["aggregation"] == agg]["value"].max() * 1.8
-            violin = sns.violinplot(
-                x="type",
-                y="value",
-                data=df_long[df_long["aggregation"] == agg],
-                hue="type",
-                palette=type_palette,
-                bw_method=0.5,
-                edgecolor="black",
-                linewidth=1,
-                linecolor="k",
-                ax=ax,
-                inner=None,
-                legend=False,
-            )
-            sns.boxplot(
-                x="type",
-                y="value",
-                hue="type",
-                palette=type_palette,
-                data=df_long[df_long["aggregation"] == agg],
-                width=0.12,
-                showcaps=True,
-                showbox=True,
-                whiskerprops={"linewidth": 1.2, "color": "black"},
-                medianprops={"linewidth": 1.2, "color": "black"},
-                ax=ax,
-                fliersize=5,
-            )
-
-            for violin_part in violin.collections:
-                violin_part.set_alpha(0.6)
-
-            if include_strip:
-                sns.stripplot(
-                    x="type",
-                    y="value",
-                    hue="type",
-                    data=df_long[df_long["aggregation"] == agg],
-                    alpha=0.3,
-                    palette=type_palette,
-                    size=3,
-                    marker="d",
-                    edgecolor="black",
-                    linewidth=1,
-                    ax=ax,
-                    dodge=False,
-                )
+            data = df_long[df_long["aggregation"] == agg]
+            y_max = data["value"].max() * 1.8
+            if self.__use_density(len(data)):
+                self.__draw_density_violins(ax, data, types)
+            else:
+                self.__draw_violins(ax, data, include_strip)
 
             ax.set_xlabel("")
             ax.yaxis.set_minor_locator(ticker.MultipleLocator(1))
@@ -212,7 +478,7 @@ class Viz:
                 x_shift += 1 / number_of_types
 
             if i > 0:  # increase to print 'n=...' more sparsly
-                for x_category in df_long["type"].unique():
+                for x_category in types:
                     filtered_values = stats_values.loc[
                         (stats_values["aggregation"] == agg)
                         & (stats_values["type"] == x_category),
@@ -221,7 +487,7 @@ class Viz:
                     n_value = (
                         int(filtered_values.iloc[0]) if not filtered_values.empty else 0
                     )
-                    x_position = list(df_long["type"].unique()).index(x_category)
+                    x_position = types.index(x_category)
                     ax.text(
                         x_position,
                         -0.18 * y_max,
@@ -261,9 +527,10 @@ class Viz:
             var_name="aggregation",
             value_name="value",
         )
+        df_long["type"] = self.__order_types(df_long["type"])
 
         stats_values = (
-            df_long.groupby(["type", "aggregation"])["value"]
+            df_long.groupby(["type", "aggregation"], observed=True)["value"]
             .agg(["mean", "median", "count", "std"])
             .reset_index()
         )
@@ -286,9 +553,10 @@ class Viz:
             var_name="aggregation",
             value_name="value",
         )
+        df_long["type"] = self.__order_types(df_long["type"])
 
         stats_values = (
-            df_long.groupby(["type", "aggregation"])["value"]
+            df_long.groupby(["type", "aggregation"], observed=True)["value"]
             .agg(["mean", "median", "count", "std"])
             .reset_index()
         )
@@ -301,10 +569,18 @@ class Viz:
         df = self.data[self.data["translation"] == "self"]
         metrics = df.filter(like=".agg.").columns.tolist()
         df_pairplot = df[metrics + ["type", "stats.asth", "stats.entropy.lops_tops"]]
+        df_pairplot = df_pairplot.assign(type=self.__order_types(df_pairplot["type"]))
 
         unique_types = df_pairplot["type"].nunique()
         markers = ["o", "s", "D", "^", "v", "P"][:unique_types]
 
+        if self.__use_density(len(df_pairplot)):
+            self.__draw_density_pairplot(df_pairplot, markers)
+            out = self.__get_file_name("pairp")
+            plt.savefig(out)
+            plt.close()
+            return out
+
         g = sns.pairplot(
             df_pairplot,
             hue="type",
@@ -328,44 +604,85 @@ class Viz:
         plt.close()
         return out
 
-    def plot_sankey(self):
-        df = self.data.copy()
-        flow_counts = {"yes": {}, "no": {}, "depends": {}}
-        for id_value, group in df.groupby("id"):
-            source_type = group[group["translation"] == "self"]["type"].values[0]
-            for _, row in group.iterrows():
-                target_type = row["type"]
-                translation_type = row["translation"]
-                if translation_type in self.translatability:
-                    if (source_type, target_type) not in flow_counts[translation_type]:
-                        flow_counts[translation_type][
-                            (source_type, target_type)
-                        ] = set()
-                    flow_counts[translation_type][(source_type, target_type)].add(
-                        id_value
+    def __draw_density_pairplot(self, df, markers):
+        """Pair plot of binned counts: one marker per occupied bin and logic"""
+        palette = self.config.color_palette
+        variables = [column for column in df.columns if column != "type"]
+        types = list(df["type"].cat.categories)
+        edges = {var: _bin_edges(df[var]) for var in variables}
+        size = len(variables)
+        fig, axes = plt.subplots(size, size, figsize=(2.5 * size, 2.5 * size))
+
+        for row, y_var in enumerate(variables):
+            for col, x_var in enumerate(variables):
+                ax = axes[row][col]
+                for logic, marker in zip(types, markers):
+                    subset = df[df["type"] == logic]
+                    if row == col:
+                        grid, density = _smoothed_density(subset[x_var])
+                        if grid.size:
+                            ax.fill_between(
+                                grid, density, color=palette.get(logic), alpha=0.6
+                            )
+                            ax.plot(grid, density, color="black", linewidth=0.8)
+                        continue
+                    pairs = subset[[x_var, y_var]].dropna().to_numpy(dtype=float)
+                    counts, x_edges, y_edges = np.histogram2d(
+                        pairs[:, 0], pairs[:, 1], bins=[edges[x_var], edges[y_var]]
                     )
+                    xi, yi = np.nonzero(counts)
+                    if xi.size == 0:
+                        continue
+                    ax.scatter(
+                        (x_edges[xi] + x_edges[xi + 1]) / 2,
+                        (y_edges[yi] + y_edges[yi + 1]) / 2,
+                        s=5 + 60 * np.sqrt(counts[xi, yi] / counts.max()),
+                        marker=marker,
+                        color=palette.get(logic),
+                        edgecolor="black",
+                        alpha=0.6,
+                    )
+                ax.set_xlabel(
+                    self.title_map.get(x_var, x_var)[0] if row == size - 1 else ""
+                )
+                ax.set_ylabel(self.title_map.get(y_var, y_var)[0] if col == 0 else "")
+                if row != size - 1:
+                    ax.tick_params(labelbottom=False)
+
+        handles = [
+            Line2D(
+                [],
+                [],
+                marker=marker,
+                linestyle="",
+                color=palette.get(logic),
+                markeredgecolor="black",
+            )
+            for logic, marker in zip(types, markers)
+        ]
+        fig.legend(handles, types, loc="center right", frameon=False)
+        fig.tight_layout(rect=(0, 0, 0.93, 1))
 
-        labels = df["type"].unique().tolist()
-        source = []
-        target = []
-        value = []
-        link_labels = []
-        link_colors = []
+    def plot_sankey(self):
+        import plotly.graph_objects as go
 
+        flows = self.translation_flows
+        labels = self.data["type"].unique().tolist()
+        label_to_index = {label: idx for idx, label in enumerate(labels)}
         translation_colors = {
             "yes": "rgba(0, 128, 0, 0.7)",
             "no": "rgba(255, 0, 0, 0.7)",
             "depends": "rgba(128, 128, 128, 0.7)",
         }
 
-        label_to_index = {label: idx for idx, label in enumerate(labels)}
-        for translation_type, flows in flow_counts.items():
-            for (src, tgt), ids_set in flows.items():
-                source.append(label_to_index[src])
-                target.append(label_to_index[tgt])
-                value.append(len(ids_set))
-                link_labels.append(f"{len(ids_set)} ids ({translation_type})")
-                link_colors.append(translation_colors[translation_type])
+        source = flows["source"].map(label_to_index).tolist()
+        target = flows["target"].map(label_to_index).tolist()
+        value = flows["ids"].tolist()
+        link_labels = [
+            f"{ids} ids ({translation})"
+            for ids, translation in zip(flows["ids"], flows["translation"])
+        ]
+        link_colors = flows["translation"].map(translation_colors).tolist()
 
         fig = go.Figure(
             data=[
@@ -393,42 +710,17 @@ class Viz:
             title_text="Sankey Diagram of Translations",
             font_size=10,
         )
-        out = self.__get_file_name("sankey")
-        pio.write_image(fig, out, format="pdf")
-        return out
+        return self.exports.add(fig, self.__get_file_name("sankey"), "pdf")
 
     def plot_chord(self):
         outs = []
         for target in self.translatability:
-            df = self.data.copy()
             d3 = D3Blocks(chart="chord", frame=True, verbose=50)
-            links = []
-
-            for _, group in df.groupby("id"):
-                source_type_row = group[group["translation"] == "self"]
-                if not source_type_row.empty:
-                    source_type = source_type_row["type"].values[0]
-                    yes_targets = group[
-                        (group["translation"] == target)
-                        & (group["type"] != source_type)
-                    ]
-                    for _, row in yes_targets.iterrows():
-                        target_type = row["type"]
-                        links.append(
-                            {
-                                "source": source_type,
-                                "target": target_type,
-                                "weight": 1,
-                                "color": self.config.color_palette.get(source_type),
-                            }
-                        )
-            if len(links) > 0:
-                links_df = pd.DataFrame(links)
-                links_df = (
-                    links_df.groupby(["source", "target"])
-                    .size()
-                    .reset_index(name="weight")
-                )
+            links_df = self.__get_cross_flows(target)
+            if len(links_df) > 0:
+                links_df = links_df[["source", "target", "rows"]].rename(
+                    columns={"rows": "weight"}
+                ).reset_index(drop=True)
 
                 d3.chord(
                     links_df,
@@ -459,34 +751,19 @@ class Viz:
     def plot_dag_interactive(self):
         outs = []
         for target in self.translatability:
-            df = self.data.copy()
             G = nx.DiGraph()
 
             # constructing the directed graph
-            for _, group in df.groupby("id"):
-                source_type_row = group[group["translation"] == "self"]
-                if not source_type_row.empty:
-                    source_type = source_type_row["type"].values[0]
-                    yes_targets = group[
-                        (group["translation"] == target)
-                        & (group["type"] != source_type)
-                    ]
-                    for _, row in yes_targets.iterrows():
-                        target_type = row["type"]
-                        if G.has_edge(source_type, target_type):
-                            G[source_type][target_type]["weight"] += 1
-                        else:
-                            G.add_edge(
-                                source_type,
-                                target_type,
-                                weight=1,
-                                color=Utils.lighten_color(
-                                    hex_color=self.config.color_palette.get(
-                                        source_type, "black"
-                                    ),
-                                    opacity=0.8,
-                                ),
-                            )
+            for row in self.__get_cross_flows(target).itertuples(index=False):
+                G.add_edge(
+                    row.source,
+                    row.target,
+                    weight=row.rows,
+                    color=Utils.lighten_color(
+                        hex_color=self.config.color_palette.get(row.source, "black"),
+                        opacity=0.8,
+                    ),
+                )
 
             if G.number_of_edges() > 0:
                 # using PyVis for interactive plotting
@@ -540,3 +817,88 @@ class Viz:
                 outs.append(out)
 
         return outs
+
+
+_worker_viz = None
+
+
+def _init_render_worker(config, dataset_path, stamp, density, profile=False):
+    global _worker_viz
+    profiling.disable()  # A forked worker would report the parent's samples again
+    if profile:
+        profiling.enable()
+    _worker_viz = Viz.from_dataset_cache(config, dataset_path, stamp, density)
+    # Pool workers leave through os._exit, which skips atexit handlers
+    multiprocessing.util.Finalize(None, _worker_viz.exports.close, exitpriority=10)
+
+
+def _render_in_worker(plot):
+    """Render plot; return its output and the stage timings it recorded"""
+    output = _worker_viz.render(plot)
+    # The parent may report the plot as soon as it gets the output back
+    _worker_viz.exports.flush()
+    profiler = profiling.active()
+    return output, profiler.drain() if profiler is not None else None
+
+
+def render_plots(viz: Viz, plots, jobs=1, cache: PlotCache | None = None):
+    """
+    Render the given plot types, yielding (plot, output, reused) in input order.
+    With jobs > 1 the plots are rendered by a pool of processes; the dataset is
+    pickled once and every worker loads it once when it starts. Otherwise the
+    plotly figures of all plots are exported in one batch before the first
+    plot is yielded. With a cache, plots whose inputs are unchanged are not
+    rendered again.
+    """
+    plots = list(plots)
+    keys, outputs = {}, {}
+    if cache is not None:
+        for plot in plots:
+            keys[plot] = PlotCache.key(
+                plot,
+                viz.plot_data(plot),
+                selfonly=viz.selfonly,
+                density=viz.density,
+                config=viz.config,
+            )
+            cached = cache.lookup(keys[plot])
+            if cached is not None:
+                outputs[plot] = cached
+    pending = [plot for plot in plots if plot not in outputs]
+
+    def rendered():
+        if jobs <= 1 or len(pending) <= 1:
+            outs = [viz.render(plot) for plot in pending]
+            viz.exports.flush()
+            yield from outs
+            return
+        with tempfile.TemporaryDirectory(prefix="tlparser_viz_") as tmp:
+            dataset_path = os.path.join(tmp, "dataset.pkl")
+            viz.data.to_pickle(dataset_path)
+            with ProcessPoolExecutor(
+                max_workers=min(jobs, len(pending)),
+                initializer=_init_render_worker,
+                initargs=(
+                    viz.config,
+                    dataset_path,
+                    viz.stamp,
+                    viz.density,
+                    profiling.active() is not None,
+                ),
+            ) as pool:
+                futures = [pool.submit(_render_in_worker, plot) for plot in pending]
+                for future in futures:
+                    output, samples = future.result()
+                    if samples:
+                        profiling.active().merge(samples)
+                    yield output
+
+    results = rendered()
+    for plot in plots:
+        if plot in outputs:
+            yield plot, outputs[plot], True
+            continue
+        output = next(results)
+        if cache is not None:
+            cache.store(keys[plot], plot, output)
+        yield plot, output, False
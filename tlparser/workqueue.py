@@ -0,0 +1,287 @@
+"""SQLite-backed work queue for distributed digests.
+
+A coordinator enqueues one task per (id, logic) pair of one or more digest
+JSON files. Any number of workers, on any machine that can reach the queue
+file, claim tasks under a time-limited lease, analyze them and store the
+result. Tasks whose lease expires (e.g. because the worker died) are handed
+out again. Once all tasks are done, the results are collected into the usual
+digest output.
+
+The queue relies on SQLite file locking, which works on local disks and on
+shared file systems with working POSIX locks.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from tlparser.config import Configuration
+from tlparser.utils import Utils
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    logic TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    issues TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, seq);
+"""
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """A digest work queue stored in a single SQLite file."""
+
+    def __init__(self, path: str, *, timeout: float = 60.0) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so two workers never
+            # claim the same task
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def enqueue(
+        self,
+        json_files: list[str],
+        config: Configuration,
+        *,
+        extended: bool = False,
+        shard: tuple[int, int] | None = None,
+    ) -> int:
+        """Enqueue every logic of the given files and return the task count."""
+        with self._transaction() as conn:
+            if conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]:
+                raise ValueError(f"Queue {self.path} already contains tasks.")
+            rows = []
+            offset = 0
+            for json_file in json_files:
+                util = Utils(
+                    Configuration(
+                        file_data_in=json_file,
+                        only_with_status=config.only_with_status,
+                        logic_order=config.logic_order,
+                    )
+                )
+                data = util.load_entries()
+                for seq, entry, logic in util.iter_tasks(data, shard):
+                    task_entry = {k: v for k, v in entry.items() if k != "logics"}
+                    rows.append(
+                        (
+                            offset + seq,
+                            json_file,
+                            json.dumps(task_entry),
+                            json.dumps(logic),
+                        )
+                    )
+                offset += util.count_formulas(data)
+            conn.executemany(
+                "INSERT INTO tasks (seq, source, entry, logic) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("sources", json.dumps(json_files)),
+                    ("extended", json.dumps(extended)),
+                    ("logic_order", json.dumps(config.logic_order)),
+                ],
+            )
+        return len(rows)
+
+    def claim(self, worker: str, lease_seconds: float) -> dict | None:
+        """Lease the next pending (or expired) task to ``worker``."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT seq, source, entry, logic FROM tasks "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY seq LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = ?, owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE seq = ?",
+                (LEASED, worker, now + lease_seconds, row[0]),
+            )
+        return {
+            "seq": row[0],
+            "source": row[1],
+            "entry": json.loads(row[2]),
+            "logic": json.loads(row[3]),
+        }
+
+    def renew(self, seq: int, worker: str, lease_seconds: float) -> bool:
+        """Extend a lease; returns False if the task was taken over meanwhile."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? "
+                "WHERE seq = ? AND owner = ? AND status = ?",
+                (time.time() + lease_seconds, seq, worker, LEASED),
+            )
+        return cursor.rowcount == 1
+
+    def complete(
+        self, seq: int, worker: str, item: dict, issues: list[str] | None = None
+    ) -> bool:
+        """Store the result of a task unless another worker finished it first."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, issues = ?, error = NULL "
+                "WHERE seq = ? AND owner = ? AND status = ?",
+                (
+                    DONE,
+                    json.dumps(Utils.serialize_item(item)),
+                    json.dumps(issues) if issues else None,
+                    seq,
+                    worker,
+                    LEASED,
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def counts(self) -> dict[str, int]:
+        counts = {PENDING: 0, LEASED: 0, DONE: 0}
+        for status, count in self._conn.execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        ):
+            counts[status] = count
+        return counts
+
+    def results(self) -> tuple[list[dict], list[tuple[str, list[str]]]]:
+        """Return completed items in single-node order and their Spot issues."""
+        sources = self.get_meta("sources", [])
+        items = []
+        issues: dict[str, list[str]] = {}
+        for source, result, task_issues in self._conn.execute(
+            "SELECT source, result, issues FROM tasks WHERE status = ? ORDER BY seq",
+            (DONE,),
+        ):
+            item = json.loads(result)
+            if len(sources) > 1:
+                item = {"source": source, **item}
+            items.append(item)
+            if task_issues:
+                formula = item["stats"]["formula_raw"]
+                issues[formula] = sorted(
+                    set(issues.get(formula, [])) | set(json.loads(task_issues))
+                )
+        return items, sorted(issues.items())
+
+
+def run_worker(
+    queue: WorkQueue,
+    *,
+    worker: str | None = None,
+    lease_seconds: float = 1800.0,
+    poll_seconds: float = 5.0,
+    max_tasks: int | None = None,
+    verbose: bool = False,
+    on_task=None,
+) -> tuple[dict[str, int], list[str]]:
+    """Process tasks until the queue is drained.
+
+    Formulas that cannot be analyzed are stored as error rows, as in a local
+    digest. Returns the number of done tasks, how many of them are error
+    rows, and the Spot diagnostics.
+    While other workers still hold leases, the worker keeps polling so it can
+    take over tasks whose lease expires.
+    """
+    from tlparser.stats_ext import SpotAnalyzer
+
+    worker = worker or default_worker_name()
+    extended = bool(queue.get_meta("extended", False))
+    spot_analyzer = SpotAnalyzer(verbose=verbose) if extended else None
+    processed = {DONE: 0, "errors": 0}
+
+    while max_tasks is None or processed[DONE] < max_tasks:
+        task = queue.claim(worker, lease_seconds)
+        if task is None:
+            if queue.counts()[LEASED] == 0:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        stop = threading.Event()
+
+        def heartbeat(seq=task["seq"]):
+            while not stop.wait(lease_seconds / 3):
+                if not queue.renew(seq, worker, lease_seconds):
+                    return
+
+        keeper = threading.Thread(target=heartbeat, daemon=True)
+        keeper.start()
+        try:
+            item = Utils.analyze_logic(
+                task["entry"],
+                task["logic"],
+                extended=extended,
+                spot_analyzer=spot_analyzer,
+                verbose=verbose,
+            )
+        except Exception as exc:  # noqa: BLE001 - stored as an error row
+            item = Utils.error_item(task["entry"], task["logic"], exc)
+        finally:
+            stop.set()
+            keeper.join()
+        issues = None
+        if spot_analyzer is not None:
+            issues = spot_analyzer.issues_for(item["stats"]["formula_raw"])
+        # A task taken over after an expired lease is not ours to count
+        if queue.complete(task["seq"], worker, item, issues):
+            processed[DONE] += 1
+            processed["errors"] += bool(item.get("error"))
+        if on_task is not None:
+            on_task(task)
+
+    warnings = spot_analyzer.diagnostics if spot_analyzer is not None else []
+    return processed, warnings